@@ -0,0 +1,95 @@
+"""Report how long each app takes to import and, optionally, to start.
+
+Usage:
+    python -m benchmarks.startup_time [--lifespan] [--top N] [module ...]
+
+Each module is imported in a fresh interpreter with `-X importtime`, so the
+numbers match what a newly spawned worker pays. `--lifespan` also runs the
+app's startup and shutdown hooks, which needs a reachable database.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = [
+    "services.gateway",
+    "services.finance_service",
+    "services.goals_service",
+    "services.auth_service",
+]
+
+LIFESPAN_SNIPPET = """
+import asyncio, time
+started = time.perf_counter()
+from {module} import app
+imported = time.perf_counter()
+
+async def run():
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+        print(f"ready_ms={{(ready - started) * 1000:.1f}} startup_ms={{(ready - imported) * 1000:.1f}}")
+
+asyncio.run(run())
+"""
+
+
+def parse_importtime(stderr: str):
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return rows
+
+
+def measure_import(module: str):
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.splitlines()[-1]}")
+    return wall_ms, parse_importtime(result.stderr)
+
+
+def measure_lifespan(module: str) -> str:
+    result = subprocess.run(
+        [sys.executable, "-c", LIFESPAN_SNIPPET.format(module=module)],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return f"failed: {result.stderr.strip().splitlines()[-1]}"
+    return result.stdout.strip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list per module")
+    parser.add_argument("--lifespan", action="store_true", help="also time startup hooks")
+    args = parser.parse_args()
+
+    for module in args.modules:
+        try:
+            wall_ms, rows = measure_import(module)
+        except RuntimeError as e:
+            print(f"{module}: {e}")
+            continue
+
+        total_us = next((cumulative for _, cumulative, name in rows if name.strip() == module), 0)
+        print(f"{module}: import {total_us / 1000:.1f} ms, process wall {wall_ms:.1f} ms")
+        for self_us, cumulative_us, name in sorted(rows, reverse=True)[:args.top]:
+            print(f"    {self_us / 1000:8.1f} ms self {cumulative_us / 1000:8.1f} ms cumulative  {name.strip()}")
+        if args.lifespan:
+            print(f"    lifespan: {measure_lifespan(module)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,23 @@
-from fastapi import FastAPI, Depends, HTTPException, Request
+from fastapi import APIRouter, FastAPI, Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, EmailStr, constr
-from passlib.context import CryptContext
-from jose import JWTError, jwt
 from datetime import datetime, timedelta
+from functools import lru_cache
 import os
 from typing import Optional
 from collections import defaultdict
 from shared.config import get_settings
 
-# Password and JWT configuration
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password and JWT configuration. passlib/bcrypt and jose are imported on
+# first use so that importing this module (every service does, for
+# verify_token) stays cheap
+@lru_cache()
+def get_pwd_context():
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 settings = get_settings()
 
@@ -56,18 +62,7 @@ class User(BaseModel):
     full_name: str
     disabled: bool = False
 
-app = FastAPI()
-
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Replace with your frontend URL in production
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-async def rate_limit_middleware(request: Request, call_next):
+async def enforce_rate_limit(request: Request):
     client_ip = request.client.host
     endpoint = request.url.path
     
@@ -76,25 +71,37 @@ async def rate_limit_middleware(request: Request, call_next):
             status_code=429,
             detail="Too many requests. Please try again later."
         )
-    
-    response = await call_next(request)
-    return response
 
-app.middleware("http")(rate_limit_middleware)
+# Rate limited as a router dependency so the limit stays on the auth routes
+# when they are served from the gateway
+router = APIRouter(dependencies=[Depends(enforce_rate_limit)])
+
+def add_cors(app: FastAPI):
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # Replace with your frontend URL in production
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 def create_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    from jose import jwt
+
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=JWT_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
 
 async def verify_token(token: str = Depends(oauth2_scheme)) -> str:
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
         email: str = payload.get("sub")
@@ -104,14 +111,14 @@ async def verify_token(token: str = Depends(oauth2_scheme)) -> str:
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-@app.post("/register")
+@router.post("/register")
 async def register_user(user: UserCreate):
     # In production, check if user exists in database
     hashed_password = get_password_hash(user.password)
     # Store user in database
     return {"message": "User created successfully"}
 
-@app.post("/token")
+@router.post("/token")
 async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     # In production, validate against database
     if not form_data.username or not form_data.password:
@@ -127,3 +134,9 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
         "token_type": "bearer",
         "expires_in": JWT_EXPIRE_MINUTES * 60
     }
+
+app = FastAPI()
+
+# Configure CORS
+add_cors(app)
+app.include_router(router)
@@ -0,0 +1,102 @@
+from threading import Lock
+from typing import Dict, Iterable, Optional
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+from shared.database import TransactionCategory
+from shared.sample_data import EXPENSE_CATEGORIES, INCOME_CATEGORIES
+
+SEED_CATEGORIES = EXPENSE_CATEGORIES + INCOME_CATEGORIES
+
+
+def category_key(name: str) -> str:
+    return " ".join(name.split()).casefold()
+
+
+class CategoryService:
+    def __init__(self, seeds: Iterable[str] = SEED_CATEGORIES):
+        self.seeds = list(seeds)
+        self.seed_names = {category_key(name): name for name in self.seeds}
+        self.ids: Dict[str, int] = {}
+        self.names: Dict[int, str] = {}
+        self.seeded = False
+        self.lock = Lock()
+
+    def normalize(self, name: str) -> str:
+        key = category_key(name)
+        if not key:
+            raise ValueError("Category name must not be empty")
+        # Known spellings win over whatever casing the client sent
+        if key in self.seed_names:
+            return self.seed_names[key]
+        if key in self.ids:
+            return self.names[self.ids[key]]
+        return " ".join(name.split()).title()
+
+    def _remember(self, category: TransactionCategory):
+        self.ids[category_key(category.name)] = category.id
+        self.names[category.id] = category.name
+
+    def seed(self, db: Session):
+        with self.lock:
+            if self.seeded:
+                return
+            existing = {category_key(c.name): c for c in db.exec(select(TransactionCategory)).all()}
+            for name in self.seeds:
+                if category_key(name) not in existing:
+                    category = TransactionCategory(name=name)
+                    db.add(category)
+                    existing[category_key(name)] = category
+            try:
+                db.commit()
+            except IntegrityError:
+                # Another worker seeded concurrently; its rows are just as good
+                db.rollback()
+                existing = {category_key(c.name): c for c in db.exec(select(TransactionCategory)).all()}
+            for category in existing.values():
+                db.refresh(category)
+                self._remember(category)
+            self.seeded = True
+
+    def get_id(self, name: str, db: Session) -> int:
+        self.seed(db)
+        name = self.normalize(name)
+        key = category_key(name)
+        category_id = self.ids.get(key)
+        if category_id is not None:
+            return category_id
+
+        with self.lock:
+            category = db.exec(
+                select(TransactionCategory).where(TransactionCategory.name == name)
+            ).first()
+            if category is None:
+                category = TransactionCategory(name=name)
+                db.add(category)
+                try:
+                    db.commit()
+                    db.refresh(category)
+                except IntegrityError:
+                    # Another worker interned the same name first
+                    db.rollback()
+                    category = db.exec(
+                        select(TransactionCategory).where(TransactionCategory.name == name)
+                    ).one()
+            self._remember(category)
+            return category.id
+
+    def get_name(self, category_id: int, db: Optional[Session] = None) -> str:
+        name = self.names.get(category_id)
+        if name is not None:
+            return name
+        if db is None:
+            raise KeyError(f"Unknown category id: {category_id}")
+
+        category = db.get(TransactionCategory, category_id)
+        if category is None:
+            raise KeyError(f"Unknown category id: {category_id}")
+        with self.lock:
+            self._remember(category)
+        return category.name
+
+
+category_service = CategoryService()
@@ -1,19 +1,23 @@
-from fastapi import FastAPI, Depends, HTTPException, BackgroundTasks, Request
-from fastapi_cache import FastAPICache
+from fastapi import APIRouter, FastAPI, Depends, HTTPException, BackgroundTasks, Request
 from fastapi_cache.decorator import cache
-from fastapi_cache.backends.redis import RedisBackend
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from sqlmodel import Session, select
-from shared.database import get_db, FinancialTransaction
+from shared.database import get_db, get_engine, FinancialTransaction, FinancialInsight, TransactionType
 from datetime import datetime, timedelta
-import json
-from typing import Dict, List, Optional
-import httpx
+from typing import Callable, Dict, List, Optional
 import os
 from services.auth_service import verify_token
 from collections import defaultdict
 from shared.sample_data import generate_sample_transactions
-from services.openrouter_service import OpenRouterService
+from shared.transaction_cache import transaction_cache
+from shared.partitioning import ensure_upcoming_partitions
+from shared.data_loader import DataLoader, get_loader
+from services.openrouter_service import openrouter
+from services.category_service import category_service
+from services.job_service import jobs_router, create_job_queue, job_accepted, submit_job
+from shared.admission import admission_control_middleware
+from shared.resilience import deadline_middleware
+from shared.lifespan import lifespan, on_startup, on_shutdown
 from shared.exceptions import (
     DatabaseError, OpenRouterError, ValidationError,
     AuthenticationError, RateLimitError,
@@ -22,12 +26,13 @@ from shared.exceptions import (
 )
 from sqlalchemy.exc import SQLAlchemyError
 
-app = FastAPI()
+router = APIRouter()
+# Superseded by /api/v1/forecast/* but kept for existing clients
+legacy_router = APIRouter()
 
-# Add exception handlers
-app.add_exception_handler(SQLAlchemyError, database_exception_handler)
-app.add_exception_handler(HTTPException, http_exception_handler)
-app.add_exception_handler(ValidationError, validation_exception_handler)
+@on_startup
+def create_upcoming_partitions():
+    ensure_upcoming_partitions(get_engine())
 
 class Transaction(BaseModel):
     amount: float
@@ -56,9 +61,15 @@ class TransactionCreate(BaseModel):
     amount: float
     category: str
     date: str
-    type: str  # "income" or "expense"
+    type: TransactionType
     description: Optional[str] = None
 
+    @field_validator("type", mode="before")
+    @classmethod
+    def normalize_type(cls, value):
+        # Same normalization the category migration applied to stored rows
+        return value.strip().lower() if isinstance(value, str) else value
+
 # Rate limiting setup
 class RateLimiter:
     def __init__(self):
@@ -85,75 +96,113 @@ class RateLimiter:
 
 rate_limiter = RateLimiter()
 
-async def get_ai_prediction(prompt: str):
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            "https://openrouter.ai/api/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {os.getenv('OPENROUTER_API_KEY')}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": "gpt-3.5-turbo",
-                "messages": [{"role": "user", "content": prompt}]
-            }
-        )
-        return response.json()
+async def get_ai_prediction(prompt: str, route: Optional[str] = None, fallback: Optional[Callable[[], Dict]] = None):
+    return await openrouter.make_request(prompt, route=route, fallback=fallback)
 
-async def format_transaction_data(transactions: List[FinancialTransaction]) -> Dict:
-    if not transactions:
-        raise HTTPException(status_code=404, detail="No transaction history found")
-    
-    monthly_data = {}
-    for tx in transactions:
-        month_key = tx.date.strftime("%Y-%m")
-        if month_key not in monthly_data:
-            monthly_data[month_key] = {"income": 0, "expenses": 0}
-        if tx.type == "income":
-            monthly_data[month_key]["income"] += tx.amount
-        else:
-            monthly_data[month_key]["expenses"] += tx.amount
-    return monthly_data
-
-async def analyze_spending_categories(transactions: List[FinancialTransaction]) -> dict:
-    categories = defaultdict(float)
-    for tx in transactions:
-        if tx.type == "expense":
-            categories[tx.category] += tx.amount
-    return dict(categories)
-
-async def validate_financial_history(user_id: int, db: Session) -> bool:
-    six_months_ago = datetime.now().date() - timedelta(days=180)
-    query = select(FinancialTransaction).where(
-        FinancialTransaction.user_id == user_id,
-        FinancialTransaction.date >= six_months_ago
+# Local estimates served when OpenRouter is slow, failing or the breaker is open
+def local_expense_prediction(monthly_data: Dict) -> Dict:
+    months = len(monthly_data)
+    return {
+        "predicted_amount": round(sum(m["expenses"] for m in monthly_data.values()) / months, 2),
+        "predicted_income": round(sum(m["income"] for m in monthly_data.values()) / months, 2),
+        "confidence": 0.5,
+        "source": "local"
+    }
+
+def local_cashflow_prediction(current_balance: float, daily_average: float, total_bills: float) -> Dict:
+    today = datetime.now().date()
+    next_month = (today.replace(day=28) + timedelta(days=4)).replace(day=1)
+    days_left = (next_month - today).days
+    predicted_balance = current_balance - daily_average * days_left - total_bills
+    return {
+        "predicted_balance": round(predicted_balance, 2),
+        "overspend_risk": predicted_balance < 0,
+        "daily_budget_suggestion": round(max(0.0, (current_balance - total_bills) / days_left), 2),
+        "source": "local"
+    }
+
+def local_insights(current: Dict[str, float], previous: Dict[str, float], comparison: Dict) -> Dict:
+    changes = sorted(
+        ((amount - previous.get(category, 0.0), category) for category, amount in current.items()),
+        reverse=True
     )
-    transactions = db.exec(query).all()
-    return len(transactions) > 0
+    insights = [
+        f"{category} spending is up ${change:.2f} on last month; set a cap for the rest of the month."
+        for change, category in changes[:3] if change > 0
+    ] or ["Spending is at or below last month's level in every category."]
+    return {"insights": insights, "comparison": comparison, "source": "local"}
 
-openrouter = OpenRouterService()
+def local_loan_score(request: "LoanPredictionRequest", debt_ratio: float) -> Dict:
+    savings_rate = request.monthly_savings / request.monthly_income if request.monthly_income > 0 else 0
+    score = (
+        request.credit_score / 850 * 500
+        + request.payment_history_percent / 100 * 250
+        + min(savings_rate, 0.3) / 0.3 * 150
+        + max(0.0, 1 - debt_ratio / 100) * 100
+    )
+    score = int(max(0, min(1000, score)))
+    return {
+        "score": score,
+        "risk_level": "low" if score >= 700 else "medium" if score >= 450 else "high",
+        "max_suggested_loan": round(max(0.0, request.monthly_income * 12 * 0.35 - sum(request.existing_loans)), 2),
+        "reasons": [],
+        "improvement_tips": [],
+        "source": "local"
+    }
 
-@app.post("/api/v1/forecast/expenses")
-async def predict_expenses(user_id: int, db: Session = Depends(get_db)):
-    # Get last 6 months of transactions
+def serialize_transaction(tx: FinancialTransaction, db: Session) -> Dict:
+    return {
+        "id": tx.id,
+        "amount": tx.amount,
+        "category": category_service.get_name(tx.category_id, db),
+        "date": tx.date.isoformat(),
+        "type": TransactionType(tx.type).value
+    }
+
+def category_names(totals: Dict[int, float], db: Session) -> Dict[str, float]:
+    return {category_service.get_name(category_id, db): amount for category_id, amount in totals.items()}
+
+async def validate_financial_history(user_id: int, loader: DataLoader) -> bool:
     six_months_ago = datetime.now().date() - timedelta(days=180)
-    query = select(FinancialTransaction).where(
-        FinancialTransaction.user_id == user_id,
-        FinancialTransaction.date >= six_months_ago
+    return loader.has_history(user_id, start=six_months_ago)
+
+# AI-backed work can run on the job queue. Users take turns; within one
+# user's queue forecasts jump ahead of insights
+job_queue = create_job_queue("finance")
+on_startup(job_queue.start)
+on_shutdown(job_queue.stop)
+JOB_PRIORITIES = {
+    "expense_forecast": 5,
+    "cashflow_forecast": 5,
+    "loan_prediction": 3,
+    "insights": 1
+}
+
+async def enqueue_job(kind: str, user_id: int, owner: str, payload: Dict, callback_url: Optional[str] = None) -> Dict:
+    job = await submit_job(
+        job_queue,
+        kind,
+        tenant=user_id,
+        owner=owner,
+        payload=payload,
+        priority=JOB_PRIORITIES[kind],
+        callback_url=callback_url
     )
-    transactions = db.exec(query).all()
-    
-    # Format historical data
-    try:
-        monthly_data = await format_transaction_data(transactions)
-    except HTTPException as e:
-        return {"error": str(e.detail), "predictions": None}
+    return job_accepted(job)
+
+async def forecast_expenses(user_id: int, loader: DataLoader) -> Dict:
+    # Get last 6 months of transactions
+    six_months_ago = datetime.now().date() - timedelta(days=180)
+    monthly_data = loader.monthly_totals(user_id, start=six_months_ago)
+    if not monthly_data:
+        return {"error": "No transaction history found", "predictions": None}
 
     # Get AI prediction
     try:
         prediction = await openrouter.make_request(
             template_name="expense_prediction",
-            history=json.dumps(monthly_data)
+            fallback=lambda: local_expense_prediction(monthly_data),
+            history=monthly_data
         )
         return {
             "historical_data": monthly_data,
@@ -162,15 +211,32 @@ async def predict_expenses(user_id: int, db: Session = Depends(get_db)):
     except HTTPException as e:
         raise e
 
-@app.post("/api/v1/forecast/cashflow")
-@cache(expire=86400)  # 24 hours
-async def predict_cashflow(
-    request: CashFlowRequest,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+@router.post("/api/v1/forecast/expenses")
+async def predict_expenses(
+    user_id: int,
+    background: bool = False,
+    callback_url: Optional[str] = None,
+    loader: DataLoader = Depends(get_loader),
+    token: str = Depends(verify_token)
 ):
-    # Get expense predictions
-    expense_prediction = await predict_expenses(user_id=request.user_id, db=db)
+    if background:
+        return await enqueue_job("expense_forecast", user_id, token, {"user_id": user_id}, callback_url)
+    return await forecast_expenses(user_id, loader)
+
+def bill_amounts(request: CashFlowRequest, loader: DataLoader) -> Dict:
+    today = datetime.now().date()
+    next_month = (today.replace(day=28) + timedelta(days=4)).replace(day=1)
+    bills = {
+        (bill.description, bill.due_date.isoformat()): bill.amount
+        for bill in loader.bills(request.user_id, start=today, end=next_month)
+    }
+    for bill in request.upcoming_bills:
+        bills.setdefault((bill.description, bill.due_date), bill.amount)
+    return bills
+
+async def forecast_cashflow(request: CashFlowRequest, loader: DataLoader) -> Dict:
+    # Get expense predictions; shares the loader so history is read once
+    expense_prediction = await forecast_expenses(request.user_id, loader)
     if "error" in expense_prediction:
         raise HTTPException(status_code=400, detail="Could not get expense predictions")
 
@@ -179,8 +245,9 @@ async def predict_cashflow(
     total_expenses = sum(month["expenses"] for month in monthly_data.values())
     daily_average = total_expenses / (len(monthly_data) * 30)
 
-    # Sum upcoming bills
-    total_bills = sum(bill.amount for bill in request.upcoming_bills)
+    # Sum upcoming bills: the stored ones due before month end, plus any the
+    # client sent that are not stored
+    total_bills = sum(bill_amounts(request, loader).values())
 
     # Create AI prompt for cash flow prediction
     prompt = f"""
@@ -197,7 +264,11 @@ async def predict_cashflow(
     """
 
     try:
-        prediction = await get_ai_prediction(prompt)
+        prediction = await get_ai_prediction(
+            prompt,
+            route="cashflow_prediction",
+            fallback=lambda: local_cashflow_prediction(request.current_balance, daily_average, total_bills)
+        )
         return {
             "current_balance": request.current_balance,
             "daily_average_spend": daily_average,
@@ -208,53 +279,50 @@ async def predict_cashflow(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
-@app.post("/api/v1/insights")
-async def get_financial_insights(
-    user_id: int,
-    db: Session = Depends(get_db),
+@router.post("/api/v1/forecast/cashflow")
+@cache(expire=86400)  # 24 hours
+async def predict_cashflow(
+    request: CashFlowRequest,
+    background_tasks: BackgroundTasks,
+    background: bool = False,
+    callback_url: Optional[str] = None,
+    loader: DataLoader = Depends(get_loader),
     token: str = Depends(verify_token)
 ):
+    if background:
+        return await enqueue_job(
+            "cashflow_forecast", request.user_id, token, {"request": request.model_dump()}, callback_url
+        )
+    return await forecast_cashflow(request, loader)
+
+async def generate_insights(user_id: int, loader: DataLoader) -> Dict:
+    db = loader.db
     # Get current and previous month transactions
     current_month = datetime.now().date().replace(day=1)
     previous_month = (current_month - timedelta(days=1)).replace(day=1)
     
-    current_query = select(FinancialTransaction).where(
-        FinancialTransaction.user_id == user_id,
-        FinancialTransaction.date >= current_month
-    )
-    previous_query = select(FinancialTransaction).where(
-        FinancialTransaction.user_id == user_id,
-        FinancialTransaction.date >= previous_month,
-        FinancialTransaction.date < current_month
-    )
-    
-    current_transactions = db.exec(current_query).all()
-    previous_transactions = db.exec(previous_query).all()
-    
     # Analyze spending patterns
-    current_categories = await analyze_spending_categories(current_transactions)
-    previous_categories = await analyze_spending_categories(previous_transactions)
+    current_categories = category_names(loader.category_totals(user_id, start=current_month), db)
+    previous_categories = category_names(
+        loader.category_totals(user_id, start=previous_month, end=current_month), db
+    )
     
     current_total = sum(current_categories.values())
     previous_total = sum(previous_categories.values())
-    
-    # Create AI prompt
-    prompt = f"""
-    Generate 3 specific cost-cutting suggestions based on:
-    Current month spending by category: {json.dumps(current_categories)}
-    Previous month spending by category: {json.dumps(previous_categories)}
-    Return only valid JSON format: {{
-        "insights": [str, str, str],
-        "comparison": {{
-            "current_total": {current_total},
-            "previous_total": {previous_total},
-            "percent_change": {((current_total - previous_total) / previous_total) * 100 if previous_total else 0}
-        }}
-    }}
-    """
+    comparison = {
+        "current_total": current_total,
+        "previous_total": previous_total,
+        "percent_change": ((current_total - previous_total) / previous_total) * 100 if previous_total else 0
+    }
     
     try:
-        ai_response = await get_ai_prediction(prompt)
+        # The totals are computed here, so the model only writes the suggestions
+        ai_response = await openrouter.make_request(
+            template_name="insights",
+            fallback=lambda: local_insights(current_categories, previous_categories, comparison),
+            current=current_categories,
+            previous=previous_categories
+        )
         
         # Store insights in database
         insight = FinancialInsight(
@@ -267,31 +335,34 @@ async def get_financial_insights(
             }
         )
         db.add(insight)
-        await db.commit()
+        db.commit()
         
         return {
             "insights": ai_response["insights"],
             "spending_analysis": {
                 "categories": current_categories,
-                "comparison": ai_response["comparison"]
+                "comparison": comparison
             },
             "generated_at": datetime.utcnow().isoformat()
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate insights: {str(e)}")
 
-@app.post("/api/v1/loan/prediction")
-async def predict_loan_eligibility(
-    request: LoanPredictionRequest,
+@router.post("/api/v1/insights")
+async def get_financial_insights(
     user_id: int,
-    db: Session = Depends(get_db),
+    background: bool = False,
+    callback_url: Optional[str] = None,
+    loader: DataLoader = Depends(get_loader),
     token: str = Depends(verify_token)
 ):
-    # Check rate limit
-    await rate_limiter.check_rate_limit(user_id)
-    
+    if background:
+        return await enqueue_job("insights", user_id, token, {"user_id": user_id}, callback_url)
+    return await generate_insights(user_id, loader)
+
+async def estimate_loan_eligibility(request: LoanPredictionRequest, user_id: int, loader: DataLoader) -> Dict:
     # Validate financial history
-    if not await validate_financial_history(user_id, db):
+    if not await validate_financial_history(user_id, loader):
         raise HTTPException(
             status_code=400,
             detail="Insufficient financial history. Minimum 6 months required."
@@ -319,7 +390,11 @@ async def predict_loan_eligibility(
     """
     
     try:
-        prediction = await get_ai_prediction(prompt)
+        prediction = await get_ai_prediction(
+            prompt,
+            route="loan_prediction",
+            fallback=lambda: local_loan_score(request, debt_ratio)
+        )
         return {
             "loan_eligibility": prediction,
             "financial_metrics": {
@@ -332,7 +407,53 @@ async def predict_loan_eligibility(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
-@app.post("/api/v1/transactions")
+@router.post("/api/v1/loan/prediction")
+async def predict_loan_eligibility(
+    request: LoanPredictionRequest,
+    user_id: int,
+    background: bool = False,
+    callback_url: Optional[str] = None,
+    loader: DataLoader = Depends(get_loader),
+    token: str = Depends(verify_token)
+):
+    # Check rate limit
+    await rate_limiter.check_rate_limit(user_id)
+    
+    if background:
+        return await enqueue_job(
+            "loan_prediction", user_id, token, {"user_id": user_id, "request": request.model_dump()}, callback_url
+        )
+    return await estimate_loan_eligibility(request, user_id, loader)
+
+# Job handlers open their own session since they outlive the request
+async def run_expense_forecast_job(payload: Dict) -> Dict:
+    with Session(get_engine()) as db:
+        return await forecast_expenses(payload["user_id"], DataLoader(db))
+
+async def run_cashflow_forecast_job(payload: Dict) -> Dict:
+    with Session(get_engine()) as db:
+        return await forecast_cashflow(CashFlowRequest(**payload["request"]), DataLoader(db))
+
+async def run_insights_job(payload: Dict) -> Dict:
+    with Session(get_engine()) as db:
+        return await generate_insights(payload["user_id"], DataLoader(db))
+
+async def run_loan_prediction_job(payload: Dict) -> Dict:
+    with Session(get_engine()) as db:
+        return await estimate_loan_eligibility(
+            LoanPredictionRequest(**payload["request"]), payload["user_id"], DataLoader(db)
+        )
+
+job_queue.register("expense_forecast", run_expense_forecast_job)
+job_queue.register("cashflow_forecast", run_cashflow_forecast_job)
+job_queue.register("insights", run_insights_job)
+job_queue.register("loan_prediction", run_loan_prediction_job)
+
+@router.get("/api/v1/metrics/openrouter")
+async def get_openrouter_metrics():
+    return openrouter.metrics()
+
+@router.post("/api/v1/transactions")
 async def add_transaction(
     transaction: TransactionCreate,
     user_id: int,
@@ -343,20 +464,28 @@ async def add_transaction(
         new_transaction = FinancialTransaction(
             user_id=user_id,
             amount=transaction.amount,
-            category=transaction.category,
+            category_id=category_service.get_id(transaction.category, db),
             date=datetime.strptime(transaction.date, "%Y-%m-%d").date(),
             type=transaction.type
         )
         db.add(new_transaction)
-        await db.commit()
+        db.commit()
     except SQLAlchemyError as e:
         raise DatabaseError(f"Failed to store transaction: {str(e)}")
     except ValueError as e:
         raise ValidationError(f"Invalid transaction data: {str(e)}")
     
-    return {"status": "success", "transaction": new_transaction}
+    transaction_cache.append(
+        user_id,
+        new_transaction.date,
+        new_transaction.amount,
+        new_transaction.category_id,
+        new_transaction.type
+    )
+    
+    return {"status": "success", "transaction": serialize_transaction(new_transaction, db)}
 
-@app.get("/api/v1/transactions")
+@router.get("/api/v1/transactions")
 async def get_transactions(
     user_id: int,
     start_date: Optional[str] = None,
@@ -372,9 +501,9 @@ async def get_transactions(
         query = query.where(FinancialTransaction.date <= datetime.strptime(end_date, "%Y-%m-%d").date())
     
     transactions = db.exec(query).all()
-    return {"transactions": transactions}
+    return {"transactions": [serialize_transaction(tx, db) for tx in transactions]}
 
-@app.post("/api/v1/sample-data")
+@router.post("/api/v1/sample-data")
 async def create_sample_data(
     user_id: int,
     months: int = 6,
@@ -384,26 +513,47 @@ async def create_sample_data(
     sample_transactions = generate_sample_transactions(user_id, months)
     
     for tx_data in sample_transactions:
+        tx_data["category_id"] = category_service.get_id(tx_data.pop("category"), db)
         transaction = FinancialTransaction(**tx_data)
         db.add(transaction)
     
-    await db.commit()
+    db.commit()
+    for tx_data in sample_transactions:
+        transaction_cache.append(
+            user_id, tx_data["date"], tx_data["amount"], tx_data["category_id"], tx_data["type"]
+        )
     return {
         "status": "success",
         "message": f"Created {len(sample_transactions)} sample transactions"
     }
 
-@app.post("/predict/expenses")
-async def predict_expenses(transactions: List[Transaction]):
+@legacy_router.post("/predict/expenses")
+async def predict_expenses_legacy(transactions: List[Transaction]):
     prompt = f"Predict monthly expenses based on: {transactions}"
     return await get_ai_prediction(prompt)
 
-@app.post("/predict/cashflow")
-async def predict_cashflow(transactions: List[Transaction]):
+@legacy_router.post("/predict/cashflow")
+async def predict_cashflow_legacy(transactions: List[Transaction]):
     prompt = f"Analyze cash flow patterns for: {transactions}"
     return await get_ai_prediction(prompt)
 
-@app.post("/predict/loan")
+@legacy_router.post("/predict/loan")
 async def predict_loan_approval(income: float, credit_score: int):
     prompt = f"Predict loan approval chances for income: {income}, credit: {credit_score}"
     return await get_ai_prediction(prompt)
+
+# Standalone app; services/gateway.py serves the same routers in one process
+app = FastAPI(lifespan=lifespan)
+
+# Add exception handlers
+app.add_exception_handler(SQLAlchemyError, database_exception_handler)
+app.add_exception_handler(HTTPException, http_exception_handler)
+app.add_exception_handler(ValidationError, validation_exception_handler)
+
+app.include_router(router)
+app.include_router(legacy_router)
+app.include_router(jobs_router)
+
+# Shed load per route class before it reaches the handlers
+app.middleware("http")(admission_control_middleware)
+app.middleware("http")(deadline_middleware)
@@ -0,0 +1,31 @@
+from fastapi import FastAPI, HTTPException
+from sqlalchemy.exc import SQLAlchemyError
+from services import auth_service, finance_service, goals_service
+from services.job_service import jobs_router
+from shared.admission import admission_control_middleware
+from shared.resilience import deadline_middleware
+from shared.lifespan import lifespan
+from shared.exceptions import (
+    ValidationError,
+    database_exception_handler, http_exception_handler,
+    validation_exception_handler
+)
+
+# Serves every service from one process: the engine pool, OpenRouter client,
+# job workers and in-process caches are created once by the shared lifespan
+# instead of once per service. Run with `uvicorn services.gateway:app`.
+app = FastAPI(lifespan=lifespan)
+
+app.add_exception_handler(SQLAlchemyError, database_exception_handler)
+app.add_exception_handler(HTTPException, http_exception_handler)
+app.add_exception_handler(ValidationError, validation_exception_handler)
+
+app.include_router(auth_service.router)
+app.include_router(finance_service.router)
+app.include_router(finance_service.legacy_router)
+app.include_router(goals_service.router)
+app.include_router(jobs_router)
+
+app.middleware("http")(admission_control_middleware)
+app.middleware("http")(deadline_middleware)
+auth_service.add_cors(app)
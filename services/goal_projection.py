@@ -0,0 +1,89 @@
+from datetime import date
+from typing import Dict, List
+import numpy as np
+
+
+def normal_cdf(z: np.ndarray) -> np.ndarray:
+    # Abramowitz & Stegun 7.1.26 erf approximation, good to ~1e-7
+    x = np.abs(z) / np.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.3275911 * x)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1.0 - poly * np.exp(-x * x)
+    return 0.5 * (1.0 + np.sign(z) * erf)
+
+
+def savings_rate(monthly_totals: Dict[str, Dict[str, float]], start: date, end: date) -> Dict[str, float]:
+    """Mean and standard deviation of daily net savings over [start, end).
+
+    The window rarely starts or ends on a month boundary, so the mean is the
+    total net over the days actually covered, and the spread only uses the
+    months that lie entirely inside the window.
+    """
+    days = (end - start).days
+    if not monthly_totals or days <= 0:
+        return {"daily_mean": 0.0, "daily_std": 0.0}
+    months = np.array(list(monthly_totals), dtype="datetime64[M]")
+    net = np.array([m["income"] - m["expenses"] for m in monthly_totals.values()], dtype=np.float64)
+    daily_mean = net.sum() / days
+
+    month_start = months.astype("datetime64[D]")
+    month_end = (months + 1).astype("datetime64[D]")
+    complete = (month_start >= np.datetime64(start, "D")) & (month_end <= np.datetime64(end, "D"))
+    daily_std = 0.0
+    if complete.sum() > 1:
+        # Days are treated as independent, so a month's variance scales with
+        # its length; normalising each residual by sqrt(length) gives the daily spread
+        length = (month_end - month_start)[complete].astype(np.float64)
+        residual = (net[complete] - daily_mean * length) / np.sqrt(length)
+        daily_std = float(np.sqrt((residual ** 2).sum() / (complete.sum() - 1)))
+    return {"daily_mean": float(daily_mean), "daily_std": daily_std}
+
+
+def project_goals(goals: List, rate: Dict[str, float], today: date) -> List[Dict]:
+    """Progress metrics and success probability for every goal at once.
+
+    The observed net savings rate is split across unfinished goals in
+    proportion to what each needs per day; each goal then succeeds if its
+    share, accumulated until the deadline, covers the remaining amount.
+    """
+    if not goals:
+        return []
+
+    today_ordinal = today.toordinal()
+    target = np.array([g.target_amount for g in goals], dtype=np.float64)
+    current = np.array([g.current_amount for g in goals], dtype=np.float64)
+    deadline = np.array([g.deadline.toordinal() for g in goals], dtype=np.int64)
+
+    days_remaining = np.maximum(deadline - today_ordinal, 0)
+    remaining = np.maximum(target - current, 0.0)
+    active = (days_remaining > 0) & (remaining > 0)
+
+    daily_required = np.where(active, remaining / np.maximum(days_remaining, 1), 0.0)
+    progress_percent = np.where(target > 0, current / np.where(target > 0, target, 1) * 100, 100.0)
+
+    total_required = daily_required.sum()
+    share = daily_required / total_required if total_required > 0 else np.zeros_like(daily_required)
+    expected = rate["daily_mean"] * share * days_remaining
+    spread = rate["daily_std"] * share * np.sqrt(days_remaining)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (expected - remaining) / spread
+    # Clipped because z is inf where spread is 0; those goals use the step below
+    z = np.clip(np.nan_to_num(z), -40.0, 40.0)
+    probability = np.where(spread > 0, normal_cdf(z), (expected >= remaining).astype(np.float64))
+    probability = np.where(remaining <= 0, 1.0, np.where(days_remaining <= 0, 0.0, probability))
+
+    return [
+        {
+            "goal_id": goal.id,
+            "category": goal.category,
+            "target_amount": float(target[i]),
+            "current_amount": float(current[i]),
+            "progress_percent": round(float(progress_percent[i]), 2),
+            "days_remaining": int(days_remaining[i]),
+            "daily_required": round(float(daily_required[i]), 2),
+            "projected_savings": round(float(expected[i]), 2),
+            "probability_of_success": round(float(probability[i]), 3)
+        }
+        for i, goal in enumerate(goals)
+    ]
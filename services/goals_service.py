@@ -1,15 +1,29 @@
-from fastapi import FastAPI, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, FastAPI, Depends, HTTPException, BackgroundTasks
 from pydantic import BaseModel
 from datetime import datetime, date, timedelta
-from typing import Optional, List
-from shared.database import get_db, SavingsGoal
+from typing import Dict, Optional, List
+from shared.database import get_db, get_engine, SavingsGoal
+from shared.data_loader import DataLoader, get_loader
+from shared.goal_progress import record_progress, progress_range, start_downsampling, stop_downsampling
+from services.goal_projection import project_goals, savings_rate
 from services.auth_service import verify_token
-import httpx
+from services.job_service import jobs_router, create_job_queue, job_accepted, submit_job
+from shared.admission import admission_control_middleware
+from shared.resilience import deadline_middleware
+from services.openrouter_service import openrouter
+from shared.lifespan import lifespan, on_startup, on_shutdown
 import os
 import json
 from sqlmodel import select, Session
 
-app = FastAPI()
+router = APIRouter()
+
+job_queue = create_job_queue("goals")
+on_startup(job_queue.start)
+on_shutdown(job_queue.stop)
+on_startup(start_downsampling)
+on_shutdown(stop_downsampling)
+SAVINGS_TRACK_PRIORITY = 3
 
 class SavingsGoal(BaseModel):
     target_amount: float
@@ -22,45 +36,43 @@ class GoalTrackingRequest(BaseModel):
     goal_id: int
     current_amount: float
 
-async def get_ai_suggestion(prompt: str):
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            "https://openrouter.ai/api/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {os.getenv('OPENROUTER_API_KEY')}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": "gpt-3.5-turbo",
-                "messages": [{"role": "user", "content": prompt}]
-            }
-        )
-        return response.json()
+async def get_ai_suggestion(prompt: str, fallback=None):
+    return await openrouter.make_request(prompt, route="goal_suggestion", fallback=fallback)
+
+def local_goal_suggestion(daily_required: float, progress_percent: float, days_remaining: int) -> Dict:
+    if days_remaining <= 0:
+        outcome = "Deadline reached"
+    elif progress_percent >= 100:
+        outcome = "Target reached"
+    else:
+        outcome = f"On track if ${daily_required:.2f} is saved every day"
+    return {
+        "daily_required": round(daily_required, 2),
+        "projected_outcome": outcome,
+        "suggestions": [],
+        "probability_of_success": min(1.0, progress_percent / 100) if days_remaining <= 0 else None,
+        "source": "local"
+    }
 
-@app.post("/goals")
+@router.post("/goals")
 async def create_goal(goal: SavingsGoal, db=Depends(get_db)):
     # Add database operations here
     return {"status": "success", "goal": goal}
 
-@app.get("/goals/{goal_id}")
+@router.get("/goals/{goal_id}")
 async def get_goal(goal_id: int, db=Depends(get_db)):
     # Add database query here
     return {"goal_id": goal_id}
 
-@app.put("/goals/{goal_id}/progress")
+@router.put("/goals/{goal_id}/progress")
 async def update_progress(goal_id: int, current_amount: float, db=Depends(get_db)):
     # Add progress update logic here
     return {"status": "updated", "goal_id": goal_id}
 
-@app.post("/api/v1/savings/track")
-async def track_savings_goal(
-    request: GoalTrackingRequest,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
-    token: str = Depends(verify_token)
-):
+async def evaluate_savings_goal(request: GoalTrackingRequest, loader: DataLoader) -> Dict:
+    db = loader.db
     # Fetch goal
-    goal = db.get(SavingsGoal, request.goal_id)
+    goal = loader.goal(request.goal_id)
     if not goal:
         raise HTTPException(status_code=404, detail="Goal not found")
     
@@ -70,12 +82,8 @@ async def track_savings_goal(
     daily_required = (goal.target_amount - request.current_amount) / days_remaining if days_remaining > 0 else 0
     progress_percent = (request.current_amount / goal.target_amount) * 100
     
-    # Update progress history
-    goal.progress_history.append({
-        "date": datetime.utcnow().isoformat(),
-        "amount": request.current_amount,
-        "daily_required": daily_required
-    })
+    # Append to the progress series; committed together with the goal below
+    record_progress(db, goal.id, request.current_amount, daily_required)
     
     prompt = f"""
     Suggest adjustments to meet savings target of ${goal.target_amount} by {goal.deadline}.
@@ -92,13 +100,16 @@ async def track_savings_goal(
     """
     
     try:
-        ai_suggestion = await get_ai_suggestion(prompt)
+        ai_suggestion = await get_ai_suggestion(
+            prompt,
+            fallback=lambda: local_goal_suggestion(daily_required, progress_percent, days_remaining)
+        )
         
         # Update goal
         goal.current_amount = request.current_amount
         goal.last_updated = datetime.utcnow()
         db.add(goal)
-        await db.commit()
+        db.commit()
         
         return {
             "goal_progress": {
@@ -113,3 +124,118 @@ async def track_savings_goal(
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to track progress: {str(e)}")
+
+@router.post("/api/v1/savings/track")
+async def track_savings_goal(
+    request: GoalTrackingRequest,
+    background_tasks: BackgroundTasks,
+    background: bool = False,
+    callback_url: Optional[str] = None,
+    loader: DataLoader = Depends(get_loader),
+    token: str = Depends(verify_token)
+):
+    if background:
+        job = await submit_job(
+            job_queue,
+            "savings_track",
+            tenant=token,
+            owner=token,
+            payload={"request": request.model_dump()},
+            priority=SAVINGS_TRACK_PRIORITY,
+            callback_url=callback_url
+        )
+        return job_accepted(job)
+    return await evaluate_savings_goal(request, loader)
+
+async def run_savings_track_job(payload: Dict) -> Dict:
+    with Session(get_engine()) as db:
+        return await evaluate_savings_goal(GoalTrackingRequest(**payload["request"]), DataLoader(db))
+
+job_queue.register("savings_track", run_savings_track_job)
+
+@router.get("/api/v1/savings/goals/{goal_id}/progress")
+async def get_goal_progress(
+    goal_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = 1000,
+    loader: DataLoader = Depends(get_loader),
+    token: str = Depends(verify_token)
+):
+    if not loader.goal(goal_id):
+        raise HTTPException(status_code=404, detail="Goal not found")
+
+    points = progress_range(loader.db, goal_id, start=start, end=end, limit=limit)
+    return {
+        "goal_id": goal_id,
+        "points": [
+            {
+                "ts": point.ts.isoformat(),
+                "amount": point.amount,
+                "daily_required": point.daily_required,
+                "resolution": point.resolution
+            }
+            for point in points
+        ]
+    }
+
+AT_RISK_PROBABILITY = 0.8
+
+@router.post("/api/v1/savings/goals/evaluate")
+async def evaluate_all_goals(
+    user_id: int,
+    suggestions: bool = True,
+    loader: DataLoader = Depends(get_loader),
+    token: str = Depends(verify_token)
+):
+    goals = loader.goals(user_id)
+    today = date.today()
+    six_months_ago = today - timedelta(days=180)
+    tomorrow = today + timedelta(days=1)
+    rate = savings_rate(loader.monthly_totals(user_id, start=six_months_ago, end=tomorrow), six_months_ago, tomorrow)
+    projections = project_goals(goals, rate, today)
+
+    # One packed request covers every goal that needs advice
+    at_risk = [p for p in projections if p["probability_of_success"] < AT_RISK_PROBABILITY and p["days_remaining"] > 0]
+    advice = {}
+    if suggestions and at_risk:
+        rows = "\n".join(
+            f"{p['goal_id']},{p['category']},{p['target_amount'] - p['current_amount']:.0f},"
+            f"{p['days_remaining']},{p['daily_required']:.0f},{p['probability_of_success']:.2f}"
+            for p in at_risk
+        )
+        prompt = f"""
+        Net savings rate: ${rate['daily_mean']:.0f}/day.
+        Goals at risk (goal_id,category,remaining,days_left,daily_required,probability):
+        {rows}
+        Return only valid JSON mapping each goal_id to two short suggestions: {{"<goal_id>": [str, str]}}
+        """
+        # Suggestions are optional; an unusable reply must not cost the
+        # projections already computed
+        try:
+            advice = await get_ai_suggestion(prompt, fallback=dict)
+        except HTTPException:
+            advice = {}
+        if not isinstance(advice, dict):
+            advice = {}
+
+    for projection in projections:
+        projection["suggestions"] = advice.get(str(projection["goal_id"]), [])
+
+    return {
+        "user_id": user_id,
+        "savings_rate": rate,
+        "goals": projections,
+        "generated_at": datetime.utcnow().isoformat()
+    }
+
+# Standalone app; services/gateway.py serves the same routers in one process
+app = FastAPI(lifespan=lifespan)
+app.include_router(router)
+app.include_router(jobs_router)
+app.middleware("http")(admission_control_middleware)
+app.middleware("http")(deadline_middleware)
+
+@app.get("/api/v1/metrics/openrouter")
+async def get_openrouter_metrics():
+    return openrouter.metrics()
@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends, HTTPException
+from services.auth_service import verify_token
+from typing import Any, Dict, Optional
+import asyncio
+from shared.job_queue import Job, JobQueue, create_job_backend
+from shared.lifespan import on_shutdown
+
+# Shared by every service queue so one poll endpoint can find any job
+job_backend = create_job_backend()
+on_shutdown(job_backend.close)
+
+# AI jobs running at once in this process, across every service's queue
+MAX_CONCURRENT_JOBS = 4
+job_slots = asyncio.Semaphore(MAX_CONCURRENT_JOBS)
+
+jobs_router = APIRouter()
+
+def create_job_queue(namespace: str) -> JobQueue:
+    return JobQueue(namespace, backend=job_backend, max_concurrency=MAX_CONCURRENT_JOBS, slots=job_slots)
+
+async def submit_job(
+    queue: JobQueue,
+    kind: str,
+    tenant: Any,
+    owner: str,
+    payload: Dict[str, Any],
+    priority: int = 0,
+    callback_url: Optional[str] = None
+) -> Job:
+    try:
+        return await queue.enqueue(
+            kind, tenant=tenant, payload=payload, priority=priority,
+            callback_url=callback_url, owner=owner
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def job_accepted(job) -> dict:
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "poll_url": f"/api/v1/jobs/{job.id}"
+    }
+
+@jobs_router.get("/api/v1/jobs/{job_id}")
+async def get_job(job_id: str, token: str = Depends(verify_token)):
+    job = await job_backend.get(job_id)
+    # Someone else's job looks the same as a missing one
+    if not job or job.owner != token:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {
+        "job_id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "result": job.result,
+        "error": job.error,
+        "created_at": job.created_at.isoformat(),
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None
+    }
@@ -0,0 +1,131 @@
+from pydantic import BaseModel
+from collections import defaultdict, deque
+from typing import Deque, Dict, List, Optional, Tuple
+import time
+
+STATS_WINDOW_SECONDS = 300
+STATS_MAX_SAMPLES = 200
+MIN_SAMPLES = 5
+MAX_FAILURE_RATE = 0.3
+MAX_SLOW_RATE = 0.3     # share of calls that lost to a hedge
+SLOWDOWN_FACTOR = 2.0  # observed p50 this far over target counts as degraded
+
+class ModelCandidate(BaseModel):
+    name: str
+    tier: int                   # higher means better answers
+    latency_target_ms: int
+    cost_per_1k_tokens: float
+
+class RoutingPolicy(BaseModel):
+    min_tier: int
+    latency_target_ms: int
+    candidates: List[str]
+
+MODELS = {
+    model.name: model for model in [
+        ModelCandidate(name="mistral-7b-instruct", tier=1, latency_target_ms=2500, cost_per_1k_tokens=0.0002),
+        ModelCandidate(name="gpt-3.5-turbo", tier=2, latency_target_ms=4000, cost_per_1k_tokens=0.0015),
+        ModelCandidate(name="gpt-4o-mini", tier=3, latency_target_ms=6000, cost_per_1k_tokens=0.0006),
+    ]
+}
+
+# Policies for prompts built inline by the services; PromptTemplates carry
+# their own. Short numeric forecasts are fine on the small model, free-text
+# advice and credit decisions need a stronger one.
+DEFAULT_POLICIES = {
+    "cashflow_prediction": RoutingPolicy(
+        min_tier=1, latency_target_ms=3000,
+        candidates=["mistral-7b-instruct", "gpt-3.5-turbo", "gpt-4o-mini"]
+    ),
+    "loan_prediction": RoutingPolicy(
+        min_tier=2, latency_target_ms=6000,
+        candidates=["gpt-3.5-turbo", "gpt-4o-mini"]
+    ),
+    "goal_suggestion": RoutingPolicy(
+        min_tier=1, latency_target_ms=4000,
+        candidates=["mistral-7b-instruct", "gpt-3.5-turbo", "gpt-4o-mini"]
+    ),
+}
+
+class ModelStats:
+    def __init__(self):
+        self.samples: Deque[Tuple[float, bool, float, bool]] = deque(maxlen=STATS_MAX_SAMPLES)
+
+    def record(self, ok: bool, latency_ms: float, slow: bool = False):
+        self.samples.append((time.monotonic(), ok, latency_ms, slow))
+
+    def _recent(self) -> List[Tuple[float, bool, float, bool]]:
+        # Old samples age out so a model that slowed down gets retried later
+        cutoff = time.monotonic() - STATS_WINDOW_SECONDS
+        while self.samples and self.samples[0][0] < cutoff:
+            self.samples.popleft()
+        return list(self.samples)
+
+    def summary(self) -> Dict:
+        samples = self._recent()
+        latencies = sorted(latency for _, ok, latency, _ in samples if ok)
+        failures = sum(1 for _, ok, _, _ in samples if not ok)
+        slow = sum(1 for *_, was_slow in samples if was_slow)
+        return {
+            "samples": len(samples),
+            "failure_rate": failures / len(samples) if samples else 0.0,
+            "slow_rate": slow / len(samples) if samples else 0.0,
+            "p50_ms": latencies[len(latencies) // 2] if latencies else None,
+            "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else None
+        }
+
+class ModelRouter:
+    def __init__(self, models: Dict[str, ModelCandidate] = MODELS, policies: Dict[str, RoutingPolicy] = DEFAULT_POLICIES):
+        self.models = dict(models)
+        self.policies = dict(policies)
+        self.stats: Dict[str, ModelStats] = defaultdict(ModelStats)
+
+    def add_policy(self, route: str, policy: RoutingPolicy):
+        self.policies[route] = policy
+
+    def record(self, model: str, ok: bool, latency_ms: float, slow: bool = False):
+        self.stats[model].record(ok, latency_ms, slow)
+
+    def _expected_latency(self, model: ModelCandidate, summary: Dict) -> float:
+        if summary["samples"] < MIN_SAMPLES or summary["p50_ms"] is None:
+            return model.latency_target_ms
+        return summary["p50_ms"]
+
+    def _degraded(self, model: ModelCandidate, summary: Dict, policy: RoutingPolicy) -> bool:
+        if summary["samples"] < MIN_SAMPLES:
+            return False
+        if summary["failure_rate"] > MAX_FAILURE_RATE or summary["slow_rate"] > MAX_SLOW_RATE:
+            return True
+        target = min(model.latency_target_ms, policy.latency_target_ms)
+        return summary["p50_ms"] is not None and summary["p50_ms"] > target * SLOWDOWN_FACTOR
+
+    def rank(self, route: str) -> List[str]:
+        policy = self.policies.get(route)
+        if policy is None:
+            return []
+
+        eligible = [
+            self.models[name] for name in policy.candidates
+            if name in self.models and self.models[name].tier >= policy.min_tier
+        ]
+        ranked = []
+        for model in eligible:
+            summary = self.stats[model.name].summary()
+            ranked.append((
+                self._degraded(model, summary, policy),
+                self._expected_latency(model, summary),
+                model.cost_per_1k_tokens,
+                model.name
+            ))
+        # Healthy models first, then fastest, then cheapest
+        return [name for *_, name in sorted(ranked)]
+
+    def select(self, route: str, default: Optional[str] = None) -> Optional[str]:
+        ranked = self.rank(route)
+        return ranked[0] if ranked else default
+
+    def metrics(self) -> Dict:
+        return {
+            "models": {name: self.stats[name].summary() for name in self.models},
+            "routes": {route: self.rank(route) for route in self.policies}
+        }
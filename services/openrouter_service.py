@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import List, Dict, Optional
+from pydantic import BaseModel, Field, ValidationError
+from typing import Any, Callable, List, Dict, Optional
 import httpx
 import os
 from datetime import datetime, timedelta
@@ -8,24 +8,90 @@ import json
 import asyncio
 from collections import defaultdict
 from shared.config import get_settings
+from shared.resilience import (
+    HEDGE_LOST, CircuitBreaker, CircuitOpenError, DeadlineExceeded, call_with_resilience, get_deadline
+)
+from services.model_router import ModelRouter, RoutingPolicy
+from services.prompt_compaction import (
+    compact_category_totals, compact_monthly_history, count_tokens
+)
+from string import Formatter
+import time
+
+DEFAULT_MODEL = "mistral-7b-instruct"
+
+class RetryableStatusError(httpx.HTTPStatusError):
+    pass
 
 class OpenRouterResponse(BaseModel):
     id: str
     choices: List[Dict]
     model: str
     created: int
-    response_ms: Optional[int]
+    response_ms: Optional[int] = None
+
+Compactor = Callable[[Any, int], str]
 
 class PromptTemplate:
-    def __init__(self, template: str, required_vars: List[str]):
-        self.template = template
+    def __init__(
+        self,
+        template: str,
+        required_vars: List[str],
+        routing: Optional[RoutingPolicy] = None,
+        token_budget: Optional[int] = None,
+        compactors: Optional[Dict[str, Compactor]] = None
+    ):
+        self.source = template
         self.required_vars = required_vars
+        self.routing = routing
+        self.token_budget = token_budget
+        self.compactors = compactors or {}
+
+        # Precompile: drop the indentation the literals carry and check the
+        # placeholders once instead of on every call
+        self.template = "\n".join(line.strip() for line in template.strip().splitlines())
+        self.fields = {name for _, name, _, _ in Formatter().parse(self.template) if name}
+        unknown = set(required_vars) - self.fields
+        if unknown:
+            raise ValueError(f"Template has no placeholder for: {sorted(unknown)}")
+        self.fixed_tokens = count_tokens(self.template.format(**{name: "" for name in self.fields}))
+        self.stats = {"calls": 0, "raw_tokens": 0, "prompt_tokens": 0}
     
+    def _variable_budget(self, available: int) -> int:
+        compacted = [name for name in self.compactors if name in self.fields]
+        return max(1, available // max(1, len(compacted)))
+
     def format(self, **kwargs):
         missing = [var for var in self.required_vars if var not in kwargs]
         if missing:
             raise ValueError(f"Missing required variables: {missing}")
-        return self.template.format(**kwargs)
+
+        raw = self.source.format(**{
+            name: value if isinstance(value, str) else json.dumps(value)
+            for name, value in kwargs.items()
+        })
+
+        values = dict(kwargs)
+        budget = self.token_budget or 10 ** 9
+        per_variable = self._variable_budget(budget - self.fixed_tokens)
+        for name, compactor in self.compactors.items():
+            if name in values:
+                values[name] = compactor(values[name], per_variable)
+        prompt = self.template.format(**values)
+
+        self.stats["calls"] += 1
+        self.stats["raw_tokens"] += count_tokens(raw)
+        self.stats["prompt_tokens"] += count_tokens(prompt)
+        return prompt
+
+    def metrics(self) -> Dict:
+        raw, compacted = self.stats["raw_tokens"], self.stats["prompt_tokens"]
+        return {
+            **self.stats,
+            "token_budget": self.token_budget,
+            "tokens_saved": raw - compacted,
+            "savings_ratio": (raw - compacted) / raw if raw else 0.0
+        }
 
 class OpenRouterService:
     def __init__(self):
@@ -34,21 +100,52 @@ class OpenRouterService:
         self.base_url = "https://openrouter.ai/api/v1"
         self.requests = defaultdict(list)
         self.rate_limit = 50  # requests per minute
+        self.client: Optional[httpx.AsyncClient] = None
+        self.breaker = CircuitBreaker("openrouter")
+        self.router = ModelRouter()
         self.templates = {
             "expense_prediction": PromptTemplate(
                 """Analyze spending patterns and predict expenses:
                 History: {history}
                 Return JSON: {{"predicted_amount": float, "confidence": float}}""",
-                ["history"]
+                ["history"],
+                RoutingPolicy(
+                    min_tier=1, latency_target_ms=3000,
+                    candidates=["mistral-7b-instruct", "gpt-3.5-turbo", "gpt-4o-mini"]
+                ),
+                token_budget=160,
+                compactors={"history": compact_monthly_history}
+            ),
+            "insights": PromptTemplate(
+                """Generate 3 specific cost-cutting suggestions based on:
+                Current month spending by category:
+                {current}
+                Previous month spending by category:
+                {previous}
+                Return only valid JSON format: {{"insights": [str, str, str]}}""",
+                ["current", "previous"],
+                RoutingPolicy(
+                    min_tier=2, latency_target_ms=6000,
+                    candidates=["gpt-3.5-turbo", "gpt-4o-mini"]
+                ),
+                token_budget=200,
+                compactors={"current": compact_category_totals, "previous": compact_category_totals}
             ),
             "loan_eligibility": PromptTemplate(
                 """Evaluate loan eligibility:
                 Income: {income}
                 Credit Score: {credit_score}
                 Return JSON: {{"score": int, "risk_level": str}}""",
-                ["income", "credit_score"]
+                ["income", "credit_score"],
+                RoutingPolicy(
+                    min_tier=2, latency_target_ms=6000,
+                    candidates=["gpt-3.5-turbo", "gpt-4o-mini"]
+                )
             )
         }
+        for name, template in self.templates.items():
+            if template.routing:
+                self.router.add_policy(name, template.routing)
     
     async def check_rate_limit(self):
         now = datetime.utcnow()
@@ -67,7 +164,69 @@ class OpenRouterService:
         
         self.requests["calls"].append(now)
 
-    async def make_request(self, prompt: str, template_name: Optional[str] = None, **kwargs):
+    def get_client(self) -> httpx.AsyncClient:
+        # One pooled client so retries and hedges reuse connections
+        if self.client is None or self.client.is_closed:
+            self.client = httpx.AsyncClient(base_url=self.base_url)
+        return self.client
+
+    async def aclose(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def _post_completion(self, prompt: str, model: str, timeout: float) -> Dict:
+        response = await self.get_client().post(
+            "/chat/completions",
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            },
+            json={
+                "model": model,
+                "messages": [{"role": "user", "content": prompt}]
+            },
+            timeout=timeout
+        )
+        if response.status_code == 429 or response.status_code >= 500:
+            raise RetryableStatusError(
+                f"OpenRouter returned {response.status_code}",
+                request=response.request,
+                response=response
+            )
+        response.raise_for_status()
+        return response.json()
+
+    async def _routed_completion(self, prompt: str, model: str, timeout: float) -> Dict:
+        started = time.monotonic()
+        try:
+            data = await self._post_completion(prompt, model, timeout)
+        except asyncio.CancelledError as e:
+            # A hedge loser outlived the p95 hedge delay, which is exactly the
+            # slowdown routing should see; any other cancellation still tells
+            # us the model took at least this long
+            self.router.record(
+                model, True, (time.monotonic() - started) * 1000, slow=HEDGE_LOST in e.args
+            )
+            raise
+        except Exception:
+            self.router.record(model, False, (time.monotonic() - started) * 1000)
+            raise
+        # Prefer OpenRouter's own timing, which excludes our queueing
+        latency_ms = data.get("response_ms") or (time.monotonic() - started) * 1000
+        self.router.record(model, True, latency_ms)
+        return data
+
+    async def make_request(
+        self,
+        prompt: Optional[str] = None,
+        template_name: Optional[str] = None,
+        route: Optional[str] = None,
+        model: Optional[str] = None,
+        fallback: Optional[Callable[[], Any]] = None,
+        hedge: bool = True,
+        **kwargs
+    ):
         await self.check_rate_limit()
         
         if template_name:
@@ -75,42 +234,73 @@ class OpenRouterService:
                 raise ValueError(f"Unknown template: {template_name}")
             prompt = self.templates[template_name].format(**kwargs)
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{self.base_url}/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": "mistral-7b-instruct",
-                        "messages": [{"role": "user", "content": prompt}]
-                    },
-                    timeout=30.0
-                )
-                
-                response.raise_for_status()
-                data = response.json()
-                
-                validated_response = OpenRouterResponse(**data)
-                return json.loads(validated_response.choices[0]["message"]["content"])
-                
-            except httpx.RequestError as e:
-                raise HTTPException(
-                    status_code=503,
-                    detail=f"API request failed: {str(e)}"
-                )
-            except json.JSONDecodeError:
-                raise HTTPException(
-                    status_code=500,
-                    detail="Invalid JSON response from API"
-                )
-            except Exception as e:
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Prediction failed: {str(e)}"
-                )
+        # An explicit model pins the call; otherwise each attempt (retry or
+        # hedge) takes the next model in the route's current ranking
+        route = route or template_name
+        attempts = 0
+
+        def pick_model() -> str:
+            nonlocal attempts
+            if model:
+                return model
+            ranked = self.router.rank(route) if route else []
+            chosen = ranked[attempts % len(ranked)] if ranked else DEFAULT_MODEL
+            attempts += 1
+            return chosen
+
+        try:
+            data = await call_with_resilience(
+                lambda timeout: self._routed_completion(prompt, pick_model(), timeout),
+                self.breaker,
+                deadline=get_deadline(),
+                hedge=hedge,
+                retry_on=(httpx.TransportError, RetryableStatusError, asyncio.TimeoutError)
+            )
+            validated_response = OpenRouterResponse(**data)
+            return json.loads(validated_response.choices[0]["message"]["content"])
+
+        except (CircuitOpenError, DeadlineExceeded, httpx.HTTPError, asyncio.TimeoutError) as e:
+            # Degrade to the caller's local estimate instead of waiting out upstream
+            if fallback is not None:
+                return fallback()
+            raise HTTPException(
+                status_code=503,
+                detail=f"API request failed: {str(e) or type(e).__name__}"
+            )
+        except (json.JSONDecodeError, ValidationError, KeyError, IndexError, TypeError):
+            # A reply we cannot read is no better than no reply
+            if fallback is not None:
+                return fallback()
+            raise HTTPException(
+                status_code=500,
+                detail="Invalid JSON response from API"
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Prediction failed: {str(e)}"
+            )
+
+    def metrics(self) -> Dict:
+        return {
+            "circuit_breaker": self.breaker.metrics(),
+            "model_routing": self.router.metrics(),
+            "prompt_tokens": {name: template.metrics() for name, template in self.templates.items()}
+        }
+
+    def add_template(
+        self,
+        name: str,
+        template: str,
+        required_vars: List[str],
+        routing: Optional[RoutingPolicy] = None,
+        token_budget: Optional[int] = None,
+        compactors: Optional[Dict[str, Compactor]] = None
+    ):
+        self.templates[name] = PromptTemplate(template, required_vars, routing, token_budget, compactors)
+        if routing:
+            self.router.add_policy(name, routing)
 
-    def add_template(self, name: str, template: str, required_vars: List[str]):
-        self.templates[name] = PromptTemplate(template, required_vars)
+# Shared per worker so every service reuses one connection pool, breaker
+# and set of routing stats
+openrouter = OpenRouterService()
@@ -0,0 +1,65 @@
+from typing import Dict, List, Union
+import json
+import re
+
+# Rough stand-in for a BPE tokenizer: words, 1-3 digit runs (as cl100k splits
+# numbers) and single punctuation marks each count as one token
+TOKEN_PATTERN = re.compile(r"[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d]")
+
+def count_tokens(text: str) -> int:
+    return len(TOKEN_PATTERN.findall(text))
+
+def format_amount(value: float) -> str:
+    # Whole currency units are plenty for the model and half the tokens
+    return str(int(round(value)))
+
+def _load(value: Union[str, Dict]) -> Dict:
+    return json.loads(value) if isinstance(value, str) else value
+
+def compact_monthly_history(history: Union[str, Dict[str, Dict[str, float]]], max_tokens: int) -> str:
+    """Render month -> {income, expenses} as a CSV table within `max_tokens`.
+
+    The oldest months are folded into a single averaged row until the table
+    fits; the most recent month is always kept in full.
+    """
+    history = _load(history)
+    months = sorted(history)
+    header = "month,income,expenses"
+
+    def render(folded: List[str], detailed: List[str]) -> str:
+        rows = [header]
+        if folded:
+            income = sum(history[m]["income"] for m in folded) / len(folded)
+            expenses = sum(history[m]["expenses"] for m in folded) / len(folded)
+            rows.append(f"avg {folded[0]}..{folded[-1]},{format_amount(income)},{format_amount(expenses)}")
+        rows.extend(
+            f"{m},{format_amount(history[m]['income'])},{format_amount(history[m]['expenses'])}"
+            for m in detailed
+        )
+        return "\n".join(rows)
+
+    split = 0
+    table = render([], months)
+    while count_tokens(table) > max_tokens and split < len(months) - 1:
+        split += 1
+        table = render(months[:split], months[split:])
+    return table
+
+def compact_category_totals(totals: Union[str, Dict[str, float]], max_tokens: int) -> str:
+    """Render category -> amount as CSV, largest first, folding the tail into Other."""
+    totals = _load(totals)
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+    def render(keep: int) -> str:
+        rows = [f"{name},{format_amount(amount)}" for name, amount in ranked[:keep]]
+        rest = sum(amount for _, amount in ranked[keep:])
+        if rest:
+            rows.append(f"Other,{format_amount(rest)}")
+        return "\n".join(rows) if rows else "none"
+
+    keep = len(ranked)
+    table = render(keep)
+    while count_tokens(table) > max_tokens and keep > 1:
+        keep -= 1
+        table = render(keep)
+    return table
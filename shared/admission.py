@@ -0,0 +1,143 @@
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Optional
+import asyncio
+import math
+import time
+from shared.exceptions import format_error_response
+
+@dataclass(frozen=True)
+class RouteClass:
+    name: str
+    priority: int          # lower is served first when slots free up
+    max_concurrency: int
+    max_queue: int
+    queue_timeout: float   # seconds a request may wait for a slot
+
+READ = RouteClass("read", priority=0, max_concurrency=32, max_queue=64, queue_timeout=2.0)
+WRITE = RouteClass("write", priority=1, max_concurrency=16, max_queue=32, queue_timeout=5.0)
+AI = RouteClass("ai", priority=2, max_concurrency=8, max_queue=16, queue_timeout=10.0)
+
+GLOBAL_CONCURRENCY = 48
+
+# Routes that wait on OpenRouter; everything else is a DB read or write
+AI_ROUTE_PREFIXES = (
+    "/api/v1/forecast/",
+    "/api/v1/insights",
+    "/api/v1/loan/",
+    "/api/v1/savings/track",
+    "/api/v1/savings/goals/evaluate",
+    "/predict/",
+)
+
+def classify_request(request: Request) -> RouteClass:
+    path = request.url.path
+    if path.startswith(AI_ROUTE_PREFIXES):
+        # Enqueueing a background job is as cheap as any other write
+        if request.query_params.get("background", "").lower() in ("1", "true"):
+            return WRITE
+        return AI
+    if request.method in ("GET", "HEAD", "OPTIONS"):
+        return READ
+    return WRITE
+
+class AdmissionRejected(Exception):
+    def __init__(self, route_class: RouteClass, retry_after: int):
+        super().__init__(f"{route_class.name} requests are over capacity")
+        self.route_class = route_class
+        self.retry_after = retry_after
+
+class AdmissionController:
+    def __init__(self, route_classes=(READ, WRITE, AI), global_concurrency: int = GLOBAL_CONCURRENCY):
+        self.route_classes = sorted(route_classes, key=lambda rc: rc.priority)
+        self.global_concurrency = global_concurrency
+        self.active = 0
+        self.active_by_class: Dict[str, int] = {rc.name: 0 for rc in route_classes}
+        self.waiters: Dict[str, Deque[asyncio.Future]] = {rc.name: deque() for rc in route_classes}
+        # Exponentially weighted service time, used for Retry-After hints
+        self.service_time: Dict[str, float] = {rc.name: 0.1 for rc in route_classes}
+
+    def _has_capacity(self, route_class: RouteClass) -> bool:
+        return (
+            self.active < self.global_concurrency
+            and self.active_by_class[route_class.name] < route_class.max_concurrency
+        )
+
+    def _take(self, route_class: RouteClass):
+        self.active += 1
+        self.active_by_class[route_class.name] += 1
+
+    def _dispatch(self):
+        for route_class in self.route_classes:
+            waiters = self.waiters[route_class.name]
+            while waiters and self._has_capacity(route_class):
+                future = waiters.popleft()
+                if future.done():
+                    continue
+                self._take(route_class)
+                future.set_result(True)
+
+    def retry_after(self, route_class: RouteClass) -> int:
+        backlog = len(self.waiters[route_class.name]) + self.active_by_class[route_class.name]
+        estimate = backlog * self.service_time[route_class.name] / route_class.max_concurrency
+        return max(1, math.ceil(estimate))
+
+    async def acquire(self, route_class: RouteClass):
+        # Class priority only matters once global slots run out, which
+        # _dispatch handles; here we just keep each class FIFO
+        if self._has_capacity(route_class) and not self.waiters[route_class.name]:
+            self._take(route_class)
+            return
+
+        waiters = self.waiters[route_class.name]
+        if len(waiters) >= route_class.max_queue:
+            raise AdmissionRejected(route_class, self.retry_after(route_class))
+
+        future = asyncio.get_running_loop().create_future()
+        waiters.append(future)
+        try:
+            await asyncio.wait_for(asyncio.shield(future), route_class.queue_timeout)
+        except asyncio.TimeoutError:
+            if future.done():
+                # Granted just as the deadline passed; keep the slot
+                return
+            future.cancel()
+            waiters.remove(future)
+            raise AdmissionRejected(route_class, self.retry_after(route_class))
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(route_class)
+            else:
+                future.cancel()
+                if future in waiters:
+                    waiters.remove(future)
+            raise
+
+    def release(self, route_class: RouteClass, elapsed: Optional[float] = None):
+        self.active -= 1
+        self.active_by_class[route_class.name] -= 1
+        if elapsed is not None:
+            previous = self.service_time[route_class.name]
+            self.service_time[route_class.name] = 0.8 * previous + 0.2 * elapsed
+        self._dispatch()
+
+admission_controller = AdmissionController()
+
+async def admission_control_middleware(request: Request, call_next):
+    route_class = classify_request(request)
+    try:
+        await admission_controller.acquire(route_class)
+    except AdmissionRejected as e:
+        return JSONResponse(
+            status_code=503,
+            content=await format_error_response(503, "SERVICE_OVERLOADED", str(e)),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+    started = time.monotonic()
+    try:
+        return await call_next(request)
+    finally:
+        admission_controller.release(route_class, time.monotonic() - started)
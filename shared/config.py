@@ -1,11 +1,15 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import List, Optional
 
 class Settings(BaseSettings):
     DATABASE_URL: str
     OPENROUTER_KEY: str
     JWT_SECRET: str
     JWT_ALGORITHM: str = "HS256"
+    REDIS_URL: Optional[str] = None
+    # Hosts background jobs may POST results to, as a JSON list
+    JOB_CALLBACK_HOSTS: List[str] = []
 
     class Config:
         env_file = ".env"
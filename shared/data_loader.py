@@ -0,0 +1,101 @@
+from datetime import date
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional
+from fastapi import Depends
+from sqlmodel import Session, select
+from shared.database import get_db, FinancialTransaction, SavingsGoal, UpcomingBill
+from shared.partitioning import hot_window_start
+from shared.transaction_cache import transaction_cache, UserHistory
+
+
+def load_user_history(user_id: int, db: Session) -> UserHistory:
+    history = transaction_cache.get(user_id)
+    if history is None:
+        # Bounded by date so PostgreSQL only scans the recent monthly partitions
+        since = hot_window_start()
+        query = select(
+            FinancialTransaction.date,
+            FinancialTransaction.amount,
+            FinancialTransaction.category_id,
+            FinancialTransaction.type
+        ).where(
+            FinancialTransaction.user_id == user_id,
+            FinancialTransaction.date >= since
+        )
+        history = UserHistory.from_transactions(db.exec(query).all(), since=since)
+        transaction_cache.put(user_id, history)
+    return history
+
+
+class DataLoader:
+    """Memoizes reads for the lifetime of one request.
+
+    Service functions called from one another share a loader, so a history
+    window or a user's goals is fetched at most once per request.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.memo: Dict[Hashable, Any] = {}
+
+    def _load(self, key: Hashable, fetch: Callable[[], Any]) -> Any:
+        if key not in self.memo:
+            self.memo[key] = fetch()
+        return self.memo[key]
+
+    def history(self, user_id: int) -> UserHistory:
+        return self._load(("history", user_id), lambda: load_user_history(user_id, self.db))
+
+    def monthly_totals(self, user_id: int, start: Optional[date] = None, end: Optional[date] = None) -> Dict:
+        return self._load(
+            ("monthly_totals", user_id, start, end),
+            lambda: self.history(user_id).monthly_totals(start=start, end=end)
+        )
+
+    def category_totals(self, user_id: int, start: Optional[date] = None, end: Optional[date] = None) -> Dict[int, float]:
+        return self._load(
+            ("category_totals", user_id, start, end),
+            lambda: self.history(user_id).category_totals(start=start, end=end)
+        )
+
+    def has_history(self, user_id: int, start: Optional[date] = None) -> bool:
+        return self.history(user_id).has_transactions(start=start)
+
+    def goals(self, user_id: int) -> List[SavingsGoal]:
+        def fetch():
+            goals = self.db.exec(select(SavingsGoal).where(SavingsGoal.user_id == user_id)).all()
+            for goal in goals:
+                self.memo[("goal", goal.id)] = goal
+            return goals
+        return self._load(("goals", user_id), fetch)
+
+    def goals_by_id(self, goal_ids: Iterable[int]) -> Dict[int, SavingsGoal]:
+        goal_ids = list(dict.fromkeys(goal_ids))
+        # Batch whatever is not loaded yet into a single IN query
+        missing = [goal_id for goal_id in goal_ids if ("goal", goal_id) not in self.memo]
+        if missing:
+            for goal in self.db.exec(select(SavingsGoal).where(SavingsGoal.id.in_(missing))).all():
+                self.memo[("goal", goal.id)] = goal
+            for goal_id in missing:
+                self.memo.setdefault(("goal", goal_id), None)
+        return {
+            goal_id: self.memo[("goal", goal_id)]
+            for goal_id in goal_ids
+            if self.memo[("goal", goal_id)] is not None
+        }
+
+    def goal(self, goal_id: int) -> Optional[SavingsGoal]:
+        return self.goals_by_id([goal_id]).get(goal_id)
+
+    def bills(self, user_id: int, start: Optional[date] = None, end: Optional[date] = None) -> List[UpcomingBill]:
+        def fetch():
+            query = select(UpcomingBill).where(UpcomingBill.user_id == user_id)
+            if start is not None:
+                query = query.where(UpcomingBill.due_date >= start)
+            if end is not None:
+                query = query.where(UpcomingBill.due_date < end)
+            return self.db.exec(query).all()
+        return self._load(("bills", user_id, start, end), fetch)
+
+
+def get_loader(db: Session = Depends(get_db)) -> DataLoader:
+    return DataLoader(db)
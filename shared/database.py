@@ -1,18 +1,55 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy import Column, Enum as SAEnum, Index, JSON
 from sqlmodel import SQLModel, Field, create_engine, Session
 from datetime import date, datetime
+from enum import Enum
 import os
 from typing import List
 from shared.config import get_settings
 
+class TransactionType(str, Enum):
+    INCOME = "income"
+    EXPENSE = "expense"
+
+class TransactionCategory(SQLModel, table=True):
+    id: int = Field(default=None, primary_key=True)
+    name: str = Field(unique=True, index=True)
+
+def transaction_type_column() -> Column:
+    # Stored by value so existing "income"/"expense" rows map directly
+    return Column(
+        SAEnum(
+            TransactionType,
+            name="transactiontype",
+            values_callable=lambda enum: [member.value for member in enum]
+        ),
+        nullable=False
+    )
+
 class FinancialTransaction(SQLModel, table=True):
+    # On PostgreSQL the table is range-partitioned by month on `date`,
+    # see shared/partitioning.py
+    __table_args__ = (Index("ix_financialtransaction_user_id_date", "user_id", "date"),)
+
     id: int = Field(default=None, primary_key=True)
     amount: float
-    category: str
+    category_id: int = Field(foreign_key="transactioncategory.id", index=True)
     date: date
     user_id: int
-    type: str  # "income" or "expense"
+    type: TransactionType = Field(sa_column=transaction_type_column())
+
+class TransactionMonthlySummary(SQLModel, table=True):
+    # Rollups of archived months, one row per user/month/category/type
+    __table_args__ = (Index("ix_transactionmonthlysummary_user_id_month", "user_id", "month"),)
+
+    id: int = Field(default=None, primary_key=True)
+    user_id: int
+    month: date
+    category_id: int = Field(foreign_key="transactioncategory.id")
+    type: TransactionType = Field(sa_column=transaction_type_column())
+    total: float
+    count: int
 
 class UpcomingBill(SQLModel, table=True):
     id: int = Field(default=None, primary_key=True)
@@ -30,9 +67,9 @@ class FinancialInsight(SQLModel, table=True):
     id: int = Field(default=None, primary_key=True)
     user_id: int
     date_generated: datetime = Field(default_factory=datetime.utcnow)
-    insights: List[str] = Field(default=[])
-    category_distribution: dict
-    month_comparison: dict
+    insights: List[str] = Field(default=[], sa_column=Column(JSON))
+    category_distribution: dict = Field(sa_column=Column(JSON))
+    month_comparison: dict = Field(sa_column=Column(JSON))
 
 class SavingsGoal(SQLModel, table=True):
     id: int = Field(default=None, primary_key=True)
@@ -43,15 +80,40 @@ class SavingsGoal(SQLModel, table=True):
     deadline: date
     category: str
     last_updated: datetime = Field(default_factory=datetime.utcnow)
-    progress_history: List[dict] = Field(default=[])
 
-settings = get_settings()
-DATABASE_URL = settings.DATABASE_URL
+class SavingsGoalProgress(SQLModel, table=True):
+    # Append-only; shared/goal_progress.py downsamples older points in place
+    __table_args__ = (Index("ix_savingsgoalprogress_goal_id_ts", "goal_id", "ts"),)
+
+    id: int = Field(default=None, primary_key=True)
+    goal_id: int = Field(foreign_key="savingsgoal.id")
+    ts: datetime = Field(default_factory=datetime.utcnow)
+    amount: float
+    daily_required: float
+    resolution: str = Field(default="raw")  # raw, daily, weekly or monthly
 
-engine = create_engine(DATABASE_URL)
-AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+# The engine is created on first use rather than at import, so importing a
+# module never touches the database; the app lifespan calls init_db()
+_engine = None
+AsyncSessionLocal = sessionmaker(class_=AsyncSession, expire_on_commit=False)
 Base = declarative_base()
 
+def get_engine():
+    global _engine
+    if _engine is None:
+        _engine = create_engine(get_settings().DATABASE_URL)
+        AsyncSessionLocal.configure(bind=_engine)
+    return _engine
+
+def init_db():
+    SQLModel.metadata.create_all(get_engine())
+
+def dispose_engine():
+    global _engine
+    if _engine is not None:
+        _engine.dispose()
+        _engine = None
+
 async def get_db():
     db = AsyncSessionLocal()
     try:
@@ -60,12 +122,10 @@ async def get_db():
         await db.close()
 
 def get_db():
-    with Session(engine) as session:
+    with Session(get_engine()) as session:
         yield session
 
 async def store_weekly_insights():
     async with AsyncSessionLocal() as session:
         # Weekly trigger logic will be handled by the application
         pass
-
-SQLModel.metadata.create_all(engine)
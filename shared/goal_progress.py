@@ -0,0 +1,143 @@
+from datetime import datetime, timedelta
+import asyncio
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import delete, update
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+from shared.database import get_engine, SavingsGoalProgress
+
+# (from, to, age after which points are rolled up)
+DOWNSAMPLE_TIERS = [
+    ("raw", "daily", timedelta(days=7)),
+    ("daily", "weekly", timedelta(days=90)),
+    ("weekly", "monthly", timedelta(days=365)),
+]
+RETENTION = timedelta(days=5 * 365)
+BATCH_SIZE = 5000
+DOWNSAMPLE_INTERVAL = timedelta(hours=1)
+
+
+def bucket_key(resolution: str) -> Callable[[datetime], Tuple]:
+    if resolution == "daily":
+        return lambda ts: (ts.year, ts.month, ts.day)
+    if resolution == "weekly":
+        return lambda ts: ts.isocalendar()[:2]
+    if resolution == "monthly":
+        return lambda ts: (ts.year, ts.month)
+    raise ValueError(f"Unknown resolution: {resolution}")
+
+
+def bucket_start(resolution: str, ts: datetime) -> datetime:
+    """Start of the bucket containing ts, so a cutoff never splits a bucket."""
+    day = ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    if resolution == "daily":
+        return day
+    if resolution == "weekly":
+        return day - timedelta(days=day.weekday())
+    if resolution == "monthly":
+        return day.replace(day=1)
+    raise ValueError(f"Unknown resolution: {resolution}")
+
+
+def record_progress(db: Session, goal_id: int, amount: float, daily_required: float, ts: Optional[datetime] = None) -> SavingsGoalProgress:
+    point = SavingsGoalProgress(
+        goal_id=goal_id,
+        ts=ts or datetime.utcnow(),
+        amount=amount,
+        daily_required=daily_required
+    )
+    db.add(point)
+    return point
+
+
+def progress_range(
+    db: Session,
+    goal_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: Optional[int] = None
+) -> List[SavingsGoalProgress]:
+    query = select(SavingsGoalProgress).where(SavingsGoalProgress.goal_id == goal_id)
+    if start is not None:
+        query = query.where(SavingsGoalProgress.ts >= start)
+    if end is not None:
+        query = query.where(SavingsGoalProgress.ts < end)
+    query = query.order_by(SavingsGoalProgress.ts)
+    if limit is not None:
+        query = query.limit(limit)
+    return db.exec(query).all()
+
+
+def _downsample_tier(db: Session, source: str, target: str, cutoff: datetime) -> int:
+    """Keep the last point of each target-sized bucket, drop the rest."""
+    key = bucket_key(target)
+    rows = db.exec(
+        select(SavingsGoalProgress.id, SavingsGoalProgress.goal_id, SavingsGoalProgress.ts)
+        .where(SavingsGoalProgress.resolution == source, SavingsGoalProgress.ts < cutoff)
+        .order_by(SavingsGoalProgress.goal_id, SavingsGoalProgress.ts)
+    ).all()
+    if not rows:
+        return 0
+
+    last_in_bucket: Dict[Tuple, int] = {}
+    for row in rows:
+        last_in_bucket[(row.goal_id, key(row.ts))] = row.id
+    keep = set(last_in_bucket.values())
+    drop = [row.id for row in rows if row.id not in keep]
+
+    keep = list(keep)
+    for i in range(0, len(keep), BATCH_SIZE):
+        db.execute(
+            update(SavingsGoalProgress)
+            .where(SavingsGoalProgress.id.in_(keep[i:i + BATCH_SIZE]))
+            .values(resolution=target)
+        )
+    for i in range(0, len(drop), BATCH_SIZE):
+        db.execute(delete(SavingsGoalProgress).where(SavingsGoalProgress.id.in_(drop[i:i + BATCH_SIZE])))
+    db.commit()
+    return len(drop)
+
+
+def downsample_progress(engine: Optional[Engine] = None, now: Optional[datetime] = None) -> Dict[str, int]:
+    engine = engine or get_engine()
+    now = now or datetime.utcnow()
+    removed = {}
+    with Session(engine) as db:
+        for source, target, age in DOWNSAMPLE_TIERS:
+            cutoff = bucket_start(target, now - age)
+            removed[target] = _downsample_tier(db, source, target, cutoff)
+
+        result = db.execute(delete(SavingsGoalProgress).where(SavingsGoalProgress.ts < now - RETENTION))
+        removed["expired"] = result.rowcount
+        db.commit()
+    return removed
+
+
+_downsample_task: Optional[asyncio.Task] = None
+
+
+async def _downsample_periodically():
+    while True:
+        try:
+            await asyncio.to_thread(downsample_progress)
+        except Exception:
+            pass  # retried on the next tick
+        await asyncio.sleep(DOWNSAMPLE_INTERVAL.total_seconds())
+
+
+def start_downsampling():
+    global _downsample_task
+    if _downsample_task is None:
+        _downsample_task = asyncio.create_task(_downsample_periodically())
+
+
+async def stop_downsampling():
+    global _downsample_task
+    if _downsample_task is not None:
+        _downsample_task.cancel()
+        await asyncio.gather(_downsample_task, return_exceptions=True)
+        _downsample_task = None
+
+
+if __name__ == "__main__":
+    downsample_progress()
@@ -0,0 +1,284 @@
+from pydantic import BaseModel, Field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from collections import OrderedDict, defaultdict, deque
+from datetime import datetime
+from urllib.parse import urlsplit
+import asyncio
+import heapq
+import itertools
+import time
+import uuid
+import httpx
+from shared.config import get_settings
+
+JOB_RESULT_TTL = 86400  # seconds, matches the cashflow response cache
+POLL_INTERVAL = 0.2     # seconds between empty dequeues on Redis
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class Job(BaseModel):
+    id: str = Field(default_factory=lambda: uuid.uuid4().hex)
+    kind: str
+    namespace: str
+    tenant: str             # fairness key; jobs are served round-robin by tenant
+    owner: Optional[str] = None  # the authenticated caller allowed to read the result
+    priority: int = 0
+    payload: Dict[str, Any] = Field(default_factory=dict)
+    status: str = "queued"  # queued, running, done, failed
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    callback_url: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+
+    @property
+    def score(self) -> float:
+        # Higher priority first, then FIFO, within one tenant's queue
+        return -self.priority * 1e10 + self.created_at.timestamp()
+
+
+def callback_allowed(url: str) -> bool:
+    # Results are only ever POSTed to registered https hosts, never to an
+    # arbitrary client-supplied address
+    parts = urlsplit(url)
+    return parts.scheme == "https" and parts.hostname in get_settings().JOB_CALLBACK_HOSTS
+
+
+class InMemoryJobBackend:
+    """Process-local backend, used when no Redis is configured and in tests."""
+
+    def __init__(self, ttl: float = JOB_RESULT_TTL):
+        self.ttl = ttl
+        self.jobs: Dict[str, Job] = {}
+        # Job ids by expiry; every save pushes a job to the end, like the
+        # Redis key TTL that save() resets
+        self.expiry: "OrderedDict[str, float]" = OrderedDict()
+        self.queues: Dict[tuple, list] = defaultdict(list)
+        self.tenants: Dict[str, deque] = defaultdict(deque)
+        self.events: Dict[str, asyncio.Event] = defaultdict(asyncio.Event)
+        self.counter = itertools.count()
+
+    def _expire(self, now: float):
+        while self.expiry:
+            job_id, expires_at = next(iter(self.expiry.items()))
+            if expires_at > now:
+                break
+            self.expiry.popitem(last=False)
+            self.jobs.pop(job_id, None)
+
+    async def save(self, job: Job):
+        now = time.monotonic()
+        self.jobs[job.id] = job
+        self.expiry[job.id] = now + self.ttl
+        self.expiry.move_to_end(job.id)
+        self._expire(now)
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        self._expire(time.monotonic())
+        return self.jobs.get(job_id)
+
+    async def push(self, job: Job):
+        await self.save(job)
+        queue = self.queues[(job.namespace, job.tenant)]
+        if not queue:
+            self.tenants[job.namespace].append(job.tenant)
+        heapq.heappush(queue, (job.score, next(self.counter), job.id))
+        self.events[job.namespace].set()
+
+    async def pop(self, namespace: str) -> Optional[Job]:
+        tenants = self.tenants[namespace]
+        # Round-robin over tenants so one busy user cannot starve the rest
+        while tenants:
+            tenant = tenants.popleft()
+            queue = self.queues[(namespace, tenant)]
+            job = None
+            while queue and job is None:
+                _, _, job_id = heapq.heappop(queue)
+                job = self.jobs.get(job_id)  # None if it expired while queued
+            if queue:
+                tenants.append(tenant)
+            else:
+                del self.queues[(namespace, tenant)]
+            if job is not None:
+                return job
+        return None
+
+    async def wait(self, namespace: str, timeout: float):
+        event = self.events[namespace]
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        event.clear()
+
+    async def close(self):
+        pass
+
+
+# Both scripts keep the tenant ring (list) and tenant set in sync with the
+# per-tenant sorted sets, so enqueue and dequeue stay atomic.
+PUSH_SCRIPT = """
+redis.call('ZADD', ARGV[1] .. ARGV[2], ARGV[3], ARGV[4])
+if redis.call('SADD', KEYS[2], ARGV[2]) == 1 then
+    redis.call('RPUSH', KEYS[1], ARGV[2])
+end
+"""
+
+POP_SCRIPT = """
+local count = redis.call('LLEN', KEYS[1])
+for i = 1, count do
+    local tenant = redis.call('LMOVE', KEYS[1], KEYS[1], 'LEFT', 'RIGHT')
+    local key = ARGV[1] .. tenant
+    local item = redis.call('ZPOPMIN', key)
+    if redis.call('ZCARD', key) == 0 then
+        redis.call('LREM', KEYS[1], 0, tenant)
+        redis.call('SREM', KEYS[2], tenant)
+    end
+    if item[1] then
+        return item[1]
+    end
+end
+return false
+"""
+
+
+class RedisJobBackend:
+    def __init__(self, url: str, prefix: str = "jobs"):
+        from redis import asyncio as aioredis
+
+        self.redis = aioredis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+        self.push_script = self.redis.register_script(PUSH_SCRIPT)
+        self.pop_script = self.redis.register_script(POP_SCRIPT)
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self.prefix}:job:{job_id}"
+
+    def _keys(self, namespace: str) -> List[str]:
+        base = f"{self.prefix}:{namespace}"
+        return [f"{base}:ring", f"{base}:tenants"]
+
+    async def save(self, job: Job):
+        await self.redis.set(self._job_key(job.id), job.model_dump_json(), ex=JOB_RESULT_TTL)
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        data = await self.redis.get(self._job_key(job_id))
+        return Job.model_validate_json(data) if data else None
+
+    async def push(self, job: Job):
+        await self.save(job)
+        await self.push_script(
+            keys=self._keys(job.namespace),
+            args=[f"{self.prefix}:{job.namespace}:queue:", job.tenant, job.score, job.id]
+        )
+
+    async def pop(self, namespace: str) -> Optional[Job]:
+        job_id = await self.pop_script(
+            keys=self._keys(namespace),
+            args=[f"{self.prefix}:{namespace}:queue:"]
+        )
+        if not job_id:
+            return None
+        return await self.get(job_id)
+
+    async def wait(self, namespace: str, timeout: float):
+        await asyncio.sleep(min(timeout, POLL_INTERVAL))
+
+    async def close(self):
+        await self.redis.close()
+
+
+def create_job_backend():
+    redis_url = get_settings().REDIS_URL
+    if redis_url:
+        return RedisJobBackend(redis_url)
+    return InMemoryJobBackend()
+
+
+class JobQueue:
+    def __init__(
+        self,
+        namespace: str,
+        backend=None,
+        max_concurrency: int = 4,
+        slots: Optional[asyncio.Semaphore] = None
+    ):
+        self.namespace = namespace
+        self.backend = backend or create_job_backend()
+        self.max_concurrency = max_concurrency
+        # Queues that share a semaphore share one concurrency cap
+        self.slots = slots or asyncio.Semaphore(max_concurrency)
+        self.handlers: Dict[str, JobHandler] = {}
+        self.workers: List[asyncio.Task] = []
+
+    def register(self, kind: str, handler: JobHandler):
+        self.handlers[kind] = handler
+
+    async def enqueue(
+        self,
+        kind: str,
+        tenant: Any,
+        payload: Dict[str, Any],
+        priority: int = 0,
+        callback_url: Optional[str] = None,
+        owner: Optional[str] = None
+    ) -> Job:
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if callback_url and not callback_allowed(callback_url):
+            raise ValueError("callback_url must be https on a registered callback host")
+        job = Job(
+            kind=kind,
+            namespace=self.namespace,
+            tenant=str(tenant),
+            owner=owner,
+            priority=priority,
+            payload=payload,
+            callback_url=callback_url
+        )
+        await self.backend.push(job)
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return await self.backend.get(job_id)
+
+    async def run_job(self, job: Job):
+        job.status = "running"
+        await self.backend.save(job)
+        try:
+            job.result = await self.handlers[job.kind](job.payload)
+            job.status = "done"
+        except Exception as e:
+            job.error = getattr(e, "detail", None) or str(e)
+            job.status = "failed"
+        job.finished_at = datetime.utcnow()
+        await self.backend.save(job)
+
+        if job.callback_url and callback_allowed(job.callback_url):
+            try:
+                async with httpx.AsyncClient() as client:
+                    await client.post(job.callback_url, content=job.model_dump_json(), timeout=10.0)
+            except httpx.HTTPError:
+                pass
+
+    async def worker(self):
+        while True:
+            # Take a slot before dequeuing so a job never waits while held
+            async with self.slots:
+                job = await self.backend.pop(self.namespace)
+                if job is not None:
+                    await self.run_job(job)
+                    continue
+            await self.backend.wait(self.namespace, timeout=1.0)
+
+    def start(self):
+        if not self.workers:
+            self.workers = [asyncio.create_task(self.worker()) for _ in range(self.max_concurrency)]
+
+    async def stop(self):
+        # The backend may be shared with other queues; its owner closes it
+        for task in self.workers:
+            task.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
@@ -0,0 +1,82 @@
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, List, Union
+import inspect
+from fastapi import FastAPI
+from fastapi_cache import FastAPICache
+from shared.config import get_settings
+from shared.database import init_db, dispose_engine
+from shared.transaction_cache import transaction_cache
+from services.openrouter_service import openrouter
+
+Hook = Callable[[], Union[None, Awaitable[None]]]
+
+# Services register their own resources here at import time; whichever app
+# serves them (standalone or the gateway) runs every hook exactly once
+startup_hooks: List[Hook] = []
+shutdown_hooks: List[Hook] = []
+
+
+def on_startup(hook: Hook) -> Hook:
+    startup_hooks.append(hook)
+    return hook
+
+
+def on_shutdown(hook: Hook) -> Hook:
+    shutdown_hooks.append(hook)
+    return hook
+
+
+async def _run(hook: Hook):
+    result = hook()
+    if inspect.isawaitable(result):
+        await result
+
+
+@on_startup
+def create_db_pool():
+    init_db()
+
+
+@on_startup
+async def init_response_cache():
+    redis_url = get_settings().REDIS_URL
+    if redis_url:
+        from redis import asyncio as aioredis
+        from fastapi_cache.backends.redis import RedisBackend
+
+        FastAPICache.init(RedisBackend(aioredis.from_url(redis_url)), prefix="finance-cache")
+    else:
+        from fastapi_cache.backends.inmemory import InMemoryBackend
+
+        FastAPICache.init(InMemoryBackend(), prefix="finance-cache")
+
+
+@on_startup
+def open_http_clients():
+    openrouter.get_client()
+
+
+@on_shutdown
+async def close_http_clients():
+    await openrouter.aclose()
+
+
+@on_shutdown
+def release_caches():
+    transaction_cache.clear()
+
+
+@on_shutdown
+def close_db_pool():
+    dispose_engine()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        for hook in startup_hooks:
+            await _run(hook)
+        yield
+    finally:
+        for hook in reversed(shutdown_hooks):
+            await _run(hook)
@@ -0,0 +1,107 @@
+from datetime import datetime
+from sqlalchemy import inspect, text
+from typing import Dict, List
+from sqlmodel import Session, SQLModel, select
+import json
+from services.category_service import category_key, category_service
+from shared.database import get_engine, init_db, TransactionCategory, SavingsGoalProgress
+from shared.partitioning import convert_to_partitioned
+
+
+def resolve_category_ids(db: Session, raw_names: List[str]) -> Dict[str, int]:
+    """Map raw category spellings to ids, flushing new categories without committing."""
+    categories = {category_key(c.name): c for c in db.exec(select(TransactionCategory)).all()}
+    keys = {}
+    for raw_name in raw_names:
+        name = category_service.normalize((raw_name or "").strip() or "Uncategorized")
+        keys[raw_name] = category_key(name)
+        if keys[raw_name] not in categories:
+            categories[keys[raw_name]] = TransactionCategory(name=name)
+            db.add(categories[keys[raw_name]])
+    db.flush()
+    return {raw_name: categories[key].id for raw_name, key in keys.items()}
+
+
+def migrate_transaction_categories(engine):
+    """Move FinancialTransaction.category/type strings onto the lookup table and enum."""
+    columns = {column["name"] for column in inspect(engine).get_columns("financialtransaction")}
+    if "category" not in columns:
+        return
+
+    SQLModel.metadata.create_all(engine, tables=[TransactionCategory.__table__])
+    is_postgres = engine.dialect.name == "postgresql"
+
+    # One transaction: a failure part way leaves the table as it was, so a
+    # rerun starts over instead of finding a half-converted schema
+    with Session(engine) as db:
+        # Map every distinct raw spelling onto its normalized category id
+        raw_names = [name for (name,) in db.exec(text("SELECT DISTINCT category FROM financialtransaction")).all()]
+        category_ids = resolve_category_ids(db, raw_names)
+
+        if "category_id" not in columns:
+            db.exec(text("ALTER TABLE financialtransaction ADD COLUMN category_id INTEGER"))
+        for raw_name, category_id in category_ids.items():
+            db.exec(
+                text("UPDATE financialtransaction SET category_id = :category_id WHERE category = :raw_name"),
+                params={"category_id": category_id, "raw_name": raw_name}
+            )
+        db.exec(text("UPDATE financialtransaction SET type = lower(trim(type))"))
+
+        if is_postgres:
+            # create_all has already made the type for transactionmonthlysummary
+            db.exec(text(
+                "DO $$ BEGIN CREATE TYPE transactiontype AS ENUM ('income', 'expense'); "
+                "EXCEPTION WHEN duplicate_object THEN NULL; END $$"
+            ))
+            db.exec(text(
+                "ALTER TABLE financialtransaction "
+                "ALTER COLUMN type TYPE transactiontype USING type::transactiontype"
+            ))
+            db.exec(text("ALTER TABLE financialtransaction ALTER COLUMN category_id SET NOT NULL"))
+            db.exec(text(
+                "ALTER TABLE financialtransaction ADD CONSTRAINT financialtransaction_category_id_fkey "
+                "FOREIGN KEY (category_id) REFERENCES transactioncategory (id)"
+            ))
+
+        db.exec(text(
+            "CREATE INDEX IF NOT EXISTS ix_financialtransaction_category_id "
+            "ON financialtransaction (category_id)"
+        ))
+        db.exec(text("ALTER TABLE financialtransaction DROP COLUMN category"))
+        db.commit()
+
+
+def migrate_goal_progress_history(engine):
+    """Move SavingsGoal.progress_history JSON lists into savingsgoalprogress rows."""
+    columns = {column["name"] for column in inspect(engine).get_columns("savingsgoal")}
+    if "progress_history" not in columns:
+        return
+
+    SQLModel.metadata.create_all(engine, tables=[SavingsGoalProgress.__table__])
+    with Session(engine) as db:
+        goals = db.exec(text("SELECT id, progress_history FROM savingsgoal")).all()
+        for goal_id, history in goals:
+            if isinstance(history, str):
+                history = json.loads(history)
+            for point in history or []:
+                db.add(SavingsGoalProgress(
+                    goal_id=goal_id,
+                    ts=datetime.fromisoformat(point["date"]),
+                    amount=point["amount"],
+                    daily_required=point.get("daily_required", 0.0)
+                ))
+        db.flush()
+        db.exec(text("ALTER TABLE savingsgoal DROP COLUMN progress_history"))
+        db.commit()
+
+
+def run_migrations():
+    engine = get_engine()
+    init_db()
+    migrate_transaction_categories(engine)
+    migrate_goal_progress_history(engine)
+    convert_to_partitioned(engine)
+
+
+if __name__ == "__main__":
+    run_migrations()
@@ -0,0 +1,213 @@
+from datetime import date
+from typing import List, Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from shared.database import get_engine
+
+PARENT_TABLE = "financialtransaction"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+
+HOT_WINDOW_MONTHS = 6       # months every analytics query reads
+PARTITIONS_AHEAD = 3        # upcoming months created in advance
+RETENTION_MONTHS = 24       # months kept as raw rows before archiving
+
+
+def month_start(value: date) -> date:
+    return value.replace(day=1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def hot_window_start(today: Optional[date] = None) -> date:
+    return add_months(month_start(today or date.today()), -HOT_WINDOW_MONTHS)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_{month:%Y_%m}"
+
+
+def is_postgres(engine: Engine) -> bool:
+    return engine.dialect.name == "postgresql"
+
+
+def is_partitioned(conn: Connection) -> bool:
+    relkind = conn.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"),
+        {"table": PARENT_TABLE}
+    ).scalar()
+    return relkind == "p"
+
+
+def list_month_partitions(conn: Connection) -> List[date]:
+    names = conn.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = to_regclass(:table)"
+    ), {"table": PARENT_TABLE}).scalars().all()
+
+    months = []
+    for name in names:
+        if name == DEFAULT_PARTITION:
+            continue
+        year, month = name[len(PARENT_TABLE) + 1:].split("_")
+        months.append(date(int(year), int(month), 1))
+    return sorted(months)
+
+
+def lock_partitions(conn: Connection):
+    # Workers start together; serialize partition DDL so only one creates
+    # each month and the rest see it through to_regclass. Released on commit.
+    conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:table))"), {"table": PARENT_TABLE})
+
+
+def create_month_partition(conn: Connection, month: date):
+    """Create and attach one month; callers hold lock_partitions()."""
+    name = partition_name(month)
+    exists = conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar()
+    if exists:
+        return
+
+    start, end = month, add_months(month, 1)
+    bounds = {"start": start, "end": end}
+    # Rows that landed in the default partition for this month have to move
+    # before the new partition can be attached
+    conn.execute(text(f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS)"))
+    conn.execute(text(
+        f"INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} "
+        "WHERE date >= :start AND date < :end"
+    ), bounds)
+    conn.execute(text(
+        f"DELETE FROM {DEFAULT_PARTITION} WHERE date >= :start AND date < :end"
+    ), bounds)
+    conn.execute(text(
+        f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    ))
+
+
+def ensure_upcoming_partitions(engine: Engine, months_ahead: int = PARTITIONS_AHEAD, today: Optional[date] = None):
+    if not is_postgres(engine):
+        return
+
+    current = month_start(today or date.today())
+    with engine.begin() as conn:
+        lock_partitions(conn)
+        if not is_partitioned(conn):
+            return
+        for offset in range(months_ahead + 1):
+            create_month_partition(conn, add_months(current, offset))
+
+
+def convert_to_partitioned(engine: Engine, months_ahead: int = PARTITIONS_AHEAD):
+    """Rebuild a plain financialtransaction table as a monthly range-partitioned one."""
+    if not is_postgres(engine):
+        return
+
+    with engine.begin() as conn:
+        lock_partitions(conn)
+        if is_partitioned(conn):
+            return
+
+        legacy = f"{PARENT_TABLE}_legacy"
+        conn.execute(text(f"ALTER TABLE {PARENT_TABLE} RENAME TO {legacy}"))
+        conn.execute(text(f"ALTER INDEX IF EXISTS {PARENT_TABLE}_pkey RENAME TO {legacy}_pkey"))
+        conn.execute(text(
+            f"ALTER INDEX IF EXISTS ix_{PARENT_TABLE}_category_id RENAME TO ix_{legacy}_category_id"
+        ))
+        conn.execute(text(
+            f"ALTER INDEX IF EXISTS ix_{PARENT_TABLE}_user_id_date RENAME TO ix_{legacy}_user_id_date"
+        ))
+        conn.execute(text(
+            f"CREATE TABLE {PARENT_TABLE} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            "PARTITION BY RANGE (date)"
+        ))
+        # The partition key has to be part of the primary key
+        conn.execute(text(f"ALTER TABLE {PARENT_TABLE} ADD PRIMARY KEY (id, date)"))
+        conn.execute(text(
+            f"ALTER TABLE {PARENT_TABLE} ADD FOREIGN KEY (category_id) REFERENCES transactioncategory (id)"
+        ))
+        conn.execute(text(f"CREATE INDEX ix_{PARENT_TABLE}_category_id ON {PARENT_TABLE} (category_id)"))
+        conn.execute(text(f"CREATE INDEX ix_{PARENT_TABLE}_user_id_date ON {PARENT_TABLE} (user_id, date)"))
+        conn.execute(text(f"ALTER SEQUENCE IF EXISTS {PARENT_TABLE}_id_seq OWNED BY {PARENT_TABLE}.id"))
+        conn.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"))
+
+        first = conn.execute(text(f"SELECT min(date) FROM {legacy}")).scalar()
+        current = month_start(date.today())
+        month = month_start(first) if first and first < current else current
+        while month <= add_months(current, months_ahead):
+            create_month_partition(conn, month)
+            month = add_months(month, 1)
+
+        conn.execute(text(f"INSERT INTO {PARENT_TABLE} SELECT * FROM {legacy}"))
+        conn.execute(text(f"DROP TABLE {legacy}"))
+
+
+def summarize_month(conn: Connection, source: str, month: date):
+    conn.execute(text(
+        "INSERT INTO transactionmonthlysummary (user_id, month, category_id, type, total, count) "
+        "SELECT user_id, :month, category_id, type, sum(amount), count(*) "
+        f"FROM {source} WHERE date >= :start AND date < :end "
+        "GROUP BY user_id, category_id, type"
+    ), {"month": month, "start": month, "end": add_months(month, 1)})
+
+
+def archive_old_transactions(engine: Engine, retention_months: int = RETENTION_MONTHS, today: Optional[date] = None) -> List[date]:
+    """Roll months older than the retention window into transactionmonthlysummary.
+
+    On PostgreSQL whole partitions are summarized, detached and dropped; other
+    backends summarize and delete the rows month by month.
+    """
+    cutoff = add_months(month_start(today or date.today()), -retention_months)
+    archived = []
+
+    if is_postgres(engine):
+        with engine.connect() as conn:
+            if not is_partitioned(conn):
+                return archived
+            months = [month for month in list_month_partitions(conn) if month < cutoff]
+        for month in months:
+            name = partition_name(month)
+            with engine.begin() as conn:
+                lock_partitions(conn)
+                if not conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar():
+                    continue  # another worker archived it first
+                summarize_month(conn, name, month)
+                conn.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+                conn.execute(text(f"DROP TABLE {name}"))
+            archived.append(month)
+        return archived
+
+    with engine.connect() as conn:
+        first = conn.execute(
+            text(f"SELECT min(date) FROM {PARENT_TABLE} WHERE date < :cutoff"),
+            {"cutoff": cutoff}
+        ).scalar()
+    if first is None:
+        return archived
+
+    if isinstance(first, str):
+        first = date.fromisoformat(first)
+    month = month_start(first)
+    while month < cutoff:
+        with engine.begin() as conn:
+            summarize_month(conn, PARENT_TABLE, month)
+            conn.execute(
+                text(f"DELETE FROM {PARENT_TABLE} WHERE date >= :start AND date < :end"),
+                {"start": month, "end": add_months(month, 1)}
+            )
+        archived.append(month)
+        month = add_months(month, 1)
+    return archived
+
+
+def maintain_partitions(engine: Optional[Engine] = None):
+    engine = engine or get_engine()
+    ensure_upcoming_partitions(engine)
+    archive_old_transactions(engine)
+
+
+if __name__ == "__main__":
+    maintain_partitions()
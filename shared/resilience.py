@@ -0,0 +1,239 @@
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+import asyncio
+import random
+import time
+from fastapi import Request
+
+DEFAULT_REQUEST_BUDGET = 20.0  # seconds an API request may spend upstream
+DEADLINE_HEADER = "X-Request-Timeout"
+# Cancellation message for the slower call of a hedged pair once the other wins
+HEDGE_LOST = "hedge lost"
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class Deadline:
+    def __init__(self, budget: float):
+        self.expires_at = time.monotonic() + budget
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+current_deadline: ContextVar[Optional[Deadline]] = ContextVar("current_deadline", default=None)
+
+
+def get_deadline(default_budget: float = DEFAULT_REQUEST_BUDGET) -> Deadline:
+    return current_deadline.get() or Deadline(default_budget)
+
+
+async def deadline_middleware(request: Request, call_next):
+    # Clients may ask for a tighter budget, never a looser one
+    budget = DEFAULT_REQUEST_BUDGET
+    try:
+        budget = min(budget, float(request.headers.get(DEADLINE_HEADER, budget)))
+    except ValueError:
+        pass
+    token = current_deadline.set(Deadline(budget))
+    try:
+        return await call_next(request)
+    finally:
+        current_deadline.reset(token)
+
+
+class CircuitBreaker:
+    """Trips on error rate or slow-call rate over a sliding window of calls."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        window: int = 50,
+        min_calls: int = 10,
+        error_threshold: float = 0.5,
+        slow_call_threshold: float = 0.5,
+        slow_call_seconds: float = 10.0,
+        cooldown: float = 30.0
+    ):
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.error_threshold = error_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.cooldown = cooldown
+        self.calls: Deque[Tuple[bool, float]] = deque(maxlen=window)
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.times_opened = 0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.cooldown:
+                self.rejected += 1
+                return False
+            self.state = self.HALF_OPEN
+            self.trial_in_flight = False
+        if self.state == self.HALF_OPEN:
+            # A single trial call decides whether to close again
+            if self.trial_in_flight:
+                self.rejected += 1
+                return False
+            self.trial_in_flight = True
+        return True
+
+    def release(self):
+        """Give back a half-open trial slot without counting the call either way."""
+        if self.state == self.HALF_OPEN:
+            self.trial_in_flight = False
+
+    def record(self, ok: bool, latency: float):
+        self.calls.append((ok, latency))
+        if self.state == self.HALF_OPEN:
+            self.trial_in_flight = False
+            if ok and latency < self.slow_call_seconds:
+                self.state = self.CLOSED
+                self.calls.clear()
+            else:
+                self._open()
+            return
+
+        if len(self.calls) < self.min_calls:
+            return
+        if self.error_rate >= self.error_threshold or self.slow_call_rate >= self.slow_call_threshold:
+            self._open()
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.times_opened += 1
+
+    @property
+    def error_rate(self) -> float:
+        if not self.calls:
+            return 0.0
+        return sum(1 for ok, _ in self.calls if not ok) / len(self.calls)
+
+    @property
+    def slow_call_rate(self) -> float:
+        if not self.calls:
+            return 0.0
+        return sum(1 for _, latency in self.calls if latency >= self.slow_call_seconds) / len(self.calls)
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        latencies = sorted(latency for ok, latency in self.calls if ok)
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, int(percentile * len(latencies)))
+        return latencies[index]
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "state": self.state,
+            "window_calls": len(self.calls),
+            "error_rate": self.error_rate,
+            "slow_call_rate": self.slow_call_rate,
+            "p50_seconds": self.latency_percentile(0.5),
+            "p95_seconds": self.latency_percentile(0.95),
+            "times_opened": self.times_opened,
+            "rejected_calls": self.rejected
+        }
+
+
+def backoff_delay(attempt: int, base: float = 0.2, cap: float = 2.0) -> float:
+    # Full jitter: spreads retries from many callers over the whole interval
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+async def call_with_resilience(
+    call: Callable[[float], Awaitable[Any]],
+    breaker: CircuitBreaker,
+    deadline: Optional[Deadline] = None,
+    retries: int = 2,
+    hedge: bool = False,
+    retry_on: Tuple[type, ...] = (Exception,)
+) -> Any:
+    """Run `call(timeout)` under a breaker, a deadline budget and jittered retries.
+
+    With `hedge`, a second identical call starts once the first has been
+    running for the breaker's observed p95 latency; the first to succeed wins.
+    """
+    deadline = deadline or get_deadline()
+    last_error: Optional[BaseException] = None
+
+    for attempt in range(retries + 1):
+        if deadline.expired:
+            raise DeadlineExceeded(f"{breaker.name}: request budget exhausted") from last_error
+        if not breaker.allow():
+            raise CircuitOpenError(f"{breaker.name}: circuit open") from last_error
+
+        started = time.monotonic()
+        try:
+            if hedge:
+                result = await _hedged(call, breaker, deadline)
+            else:
+                result = await asyncio.wait_for(call(deadline.remaining()), deadline.remaining())
+        except retry_on as e:
+            breaker.record(False, time.monotonic() - started)
+            last_error = e
+            if attempt < retries:
+                await asyncio.sleep(min(backoff_delay(attempt), deadline.remaining()))
+            continue
+        except BaseException:
+            # Client errors, bad bodies and cancellation say nothing about
+            # upstream health, but a half-open trial must not stay claimed
+            breaker.release()
+            raise
+        breaker.record(True, time.monotonic() - started)
+        return result
+
+    raise last_error
+
+
+async def _hedged(call: Callable[[float], Awaitable[Any]], breaker: CircuitBreaker, deadline: Deadline) -> Any:
+    hedge_delay = breaker.latency_percentile(0.95)
+    primary = asyncio.ensure_future(call(deadline.remaining()))
+    tasks = [primary]
+    won = False
+    try:
+        if hedge_delay is not None and hedge_delay < deadline.remaining():
+            done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+            if not done:
+                tasks.append(asyncio.ensure_future(call(deadline.remaining())))
+
+        error: Optional[BaseException] = None
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, timeout=deadline.remaining(), return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                raise asyncio.TimeoutError()
+            for task in done:
+                if task.exception() is None:
+                    won = True
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel(HEDGE_LOST if won else None)
@@ -0,0 +1,186 @@
+from collections import OrderedDict
+from datetime import date, datetime
+from threading import Lock
+from typing import Dict, Optional
+import numpy as np
+from shared.database import TransactionType
+
+# Day numbers are stored as days since the Unix epoch so they can be viewed
+# as datetime64[D] without conversion.
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+TYPE_CODES = {TransactionType.INCOME: 0, TransactionType.EXPENSE: 1}
+
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024  # bytes
+DEFAULT_TTL = 300  # seconds
+
+
+def to_day_number(value: date) -> int:
+    return value.toordinal() - EPOCH_ORDINAL
+
+
+class UserHistory:
+    """Columnar transaction history for a single user, from `since` onwards."""
+
+    INITIAL_CAPACITY = 64
+
+    def __init__(self, since: Optional[date] = None, capacity: int = INITIAL_CAPACITY):
+        capacity = max(capacity, 1)
+        self.since = since
+        self.size = 0
+        self.days = np.empty(capacity, dtype=np.int32)
+        self.amounts = np.empty(capacity, dtype=np.float64)
+        # Category ids come from the TransactionCategory lookup table, which
+        # grows with every new client spelling, so leave them plenty of room
+        self.categories = np.empty(capacity, dtype=np.uint32)
+        self.types = np.empty(capacity, dtype=np.uint8)
+        self.loaded_at = datetime.utcnow()
+
+    @classmethod
+    def from_transactions(cls, transactions, since: Optional[date] = None) -> "UserHistory":
+        history = cls(since, len(transactions))
+        for tx in transactions:
+            history.append(tx.date, tx.amount, tx.category_id, tx.type)
+        return history
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self.days.nbytes + self.amounts.nbytes
+            + self.categories.nbytes + self.types.nbytes
+        )
+
+    def _grow(self):
+        capacity = len(self.days) * 2
+        for column in ("days", "amounts", "categories", "types"):
+            old = getattr(self, column)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, column, new)
+
+    def append(self, tx_date: date, amount: float, category_id: int, tx_type: TransactionType):
+        if self.since is not None and tx_date < self.since:
+            return
+        if self.size == len(self.days):
+            self._grow()
+        i = self.size
+        self.days[i] = to_day_number(tx_date)
+        self.amounts[i] = amount
+        self.categories[i] = category_id
+        self.types[i] = TYPE_CODES[TransactionType(tx_type)]
+        self.size += 1
+
+    def _window(self, start: Optional[date], end: Optional[date]) -> np.ndarray:
+        days = self.days[:self.size]
+        mask = np.ones(self.size, dtype=bool)
+        if start is not None:
+            mask &= days >= to_day_number(start)
+        if end is not None:
+            mask &= days < to_day_number(end)
+        return mask
+
+    def has_transactions(self, start: Optional[date] = None, end: Optional[date] = None) -> bool:
+        return bool(self._window(start, end).any())
+
+    def monthly_totals(self, start: Optional[date] = None, end: Optional[date] = None) -> Dict[str, Dict[str, float]]:
+        mask = self._window(start, end)
+        if not mask.any():
+            return {}
+
+        days = self.days[:self.size][mask]
+        amounts = self.amounts[:self.size][mask]
+        is_income = self.types[:self.size][mask] == TYPE_CODES[TransactionType.INCOME]
+
+        months = days.astype("datetime64[D]").astype("datetime64[M]")
+        unique_months, index = np.unique(months, return_inverse=True)
+        income = np.bincount(index, weights=np.where(is_income, amounts, 0.0), minlength=len(unique_months))
+        expenses = np.bincount(index, weights=np.where(is_income, 0.0, amounts), minlength=len(unique_months))
+
+        return {
+            str(month): {"income": float(income[i]), "expenses": float(expenses[i])}
+            for i, month in enumerate(unique_months)
+        }
+
+    def category_totals(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        tx_type: TransactionType = TransactionType.EXPENSE
+    ) -> Dict[int, float]:
+        mask = self._window(start, end)
+        mask &= self.types[:self.size] == TYPE_CODES[TransactionType(tx_type)]
+        if not mask.any():
+            return {}
+
+        totals = np.bincount(
+            self.categories[:self.size][mask],
+            weights=self.amounts[:self.size][mask]
+        )
+        return {int(category_id): float(totals[category_id]) for category_id in np.flatnonzero(totals)}
+
+
+class TransactionCache:
+    """In-process LRU of per-user histories, bounded by total buffer size."""
+
+    def __init__(self, memory_budget: int = DEFAULT_MEMORY_BUDGET, ttl: int = DEFAULT_TTL):
+        self.memory_budget = memory_budget
+        self.ttl = ttl
+        self.entries: "OrderedDict[int, UserHistory]" = OrderedDict()
+        self.memory_used = 0
+        self.lock = Lock()
+
+    def get(self, user_id: int) -> Optional[UserHistory]:
+        with self.lock:
+            history = self.entries.get(user_id)
+            if history is None:
+                return None
+            # Other workers may have written since we loaded; drop stale entries
+            if (datetime.utcnow() - history.loaded_at).total_seconds() > self.ttl:
+                self._remove(user_id)
+                return None
+            self.entries.move_to_end(user_id)
+            return history
+
+    def put(self, user_id: int, history: UserHistory):
+        with self.lock:
+            if user_id in self.entries:
+                self._remove(user_id)
+            if history.nbytes > self.memory_budget:
+                return
+            self.entries[user_id] = history
+            self.memory_used += history.nbytes
+            self._evict()
+
+    def append(self, user_id: int, tx_date: date, amount: float, category_id: int, tx_type: TransactionType):
+        with self.lock:
+            # Uncached users pick the new row up on their next load
+            history = self.entries.get(user_id)
+            if history is None:
+                return
+            before = history.nbytes
+            history.append(tx_date, amount, category_id, tx_type)
+            self.memory_used += history.nbytes - before
+            self.entries.move_to_end(user_id)
+            self._evict()
+
+    def invalidate(self, user_id: int):
+        with self.lock:
+            if user_id in self.entries:
+                self._remove(user_id)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.memory_used = 0
+
+    def _remove(self, user_id: int):
+        history = self.entries.pop(user_id)
+        self.memory_used -= history.nbytes
+
+    def _evict(self):
+        while self.memory_used > self.memory_budget and self.entries:
+            _, history = self.entries.popitem(last=False)
+            self.memory_used -= history.nbytes
+
+
+transaction_cache = TransactionCache()
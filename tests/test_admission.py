@@ -0,0 +1,126 @@
+import asyncio
+import pytest
+from starlette.requests import Request
+from shared.admission import AI as AI_CLASS, AdmissionController, AdmissionRejected, RouteClass, classify_request
+
+READ = RouteClass("read", priority=0, max_concurrency=2, max_queue=2, queue_timeout=1.0)
+AI = RouteClass("ai", priority=2, max_concurrency=1, max_queue=1, queue_timeout=0.05)
+
+
+def controller(global_concurrency: int = 10) -> AdmissionController:
+    return AdmissionController((READ, AI), global_concurrency=global_concurrency)
+
+
+def test_admits_up_to_class_limit_then_queues():
+    async def run():
+        admission = controller()
+        await admission.acquire(READ)
+        await admission.acquire(READ)
+        waiter = asyncio.ensure_future(admission.acquire(READ))
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        assert admission.active_by_class["read"] == 2
+
+        admission.release(READ)
+        await waiter
+        assert admission.active_by_class["read"] == 2
+
+    asyncio.run(run())
+
+
+def test_rejects_when_queue_is_full():
+    async def run():
+        admission = controller()
+        await admission.acquire(AI)
+        waiter = asyncio.ensure_future(admission.acquire(AI))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await admission.acquire(AI)
+        assert rejected.value.retry_after >= 1
+        waiter.cancel()
+
+    asyncio.run(run())
+
+
+def test_queue_timeout_rejects_and_forgets_the_waiter():
+    async def run():
+        admission = controller()
+        await admission.acquire(AI)
+        with pytest.raises(AdmissionRejected):
+            await admission.acquire(AI)
+        assert not admission.waiters["ai"]
+        assert admission.active == 1
+
+    asyncio.run(run())
+
+
+def test_waiters_are_served_fifo():
+    async def run():
+        admission = controller()
+        await admission.acquire(READ)
+        await admission.acquire(READ)
+        order = []
+
+        async def wait(name):
+            await admission.acquire(READ)
+            order.append(name)
+
+        first = asyncio.ensure_future(wait("first"))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(wait("second"))
+        await asyncio.sleep(0)
+
+        admission.release(READ)
+        admission.release(READ)
+        await asyncio.gather(first, second)
+        assert order == ["first", "second"]
+
+    asyncio.run(run())
+
+
+def test_freed_global_slot_goes_to_the_higher_priority_class():
+    async def run():
+        ai_class = RouteClass("ai", priority=2, max_concurrency=1, max_queue=1, queue_timeout=1.0)
+        admission = AdmissionController((READ, ai_class), global_concurrency=1)
+        await admission.acquire(READ)
+
+        ai_waiter = asyncio.ensure_future(admission.acquire(ai_class))
+        await asyncio.sleep(0)
+        read_waiter = asyncio.ensure_future(admission.acquire(READ))
+        await asyncio.sleep(0)
+
+        admission.release(READ)
+        await read_waiter
+        assert not ai_waiter.done()
+
+        admission.release(READ)
+        await ai_waiter
+        assert admission.active_by_class == {"read": 0, "ai": 1}
+
+    asyncio.run(run())
+
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    async def run():
+        admission = controller()
+        await admission.acquire(READ)
+        await admission.acquire(READ)
+        waiter = asyncio.ensure_future(admission.acquire(READ))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+
+        admission.release(READ)
+        admission.release(READ)
+        assert admission.active == 0
+        assert not admission.waiters["read"]
+
+    asyncio.run(run())
+
+
+def test_goal_evaluation_is_an_ai_route():
+    request = Request({
+        "type": "http", "method": "POST", "path": "/api/v1/savings/goals/evaluate",
+        "query_string": b"user_id=1", "headers": []
+    })
+    assert classify_request(request) is AI_CLASS
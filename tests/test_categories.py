@@ -0,0 +1,92 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlmodel import Session, SQLModel, select
+from shared.database import TransactionCategory, TransactionType
+from shared.migrations import migrate_transaction_categories
+from services.category_service import CategoryService, category_key
+from services.finance_service import TransactionCreate
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    SQLModel.metadata.create_all(engine, tables=[TransactionCategory.__table__])
+    return engine
+
+
+def test_category_key_ignores_case_and_spacing():
+    assert category_key("  Eating   Out ") == category_key("eating out")
+
+
+def test_normalize_prefers_seed_spelling():
+    service = CategoryService(["Groceries"])
+    assert service.normalize(" groceries ") == "Groceries"
+    assert service.normalize("pet  food") == "Pet Food"
+    with pytest.raises(ValueError):
+        service.normalize("   ")
+
+
+def test_get_id_interns_each_spelling_once(engine):
+    service = CategoryService(["Groceries"])
+    with Session(engine) as db:
+        groceries = service.get_id("GROCERIES", db)
+        pets = service.get_id("pet food", db)
+        assert service.get_id("Pet  Food", db) == pets
+        assert service.get_id("groceries", db) == groceries
+        assert len(db.exec(select(TransactionCategory)).all()) == 2
+    assert service.get_name(pets) == "Pet Food"
+
+
+def test_get_id_survives_a_concurrent_insert(engine):
+    service = CategoryService([])
+
+    class RacingSession(Session):
+        def add(self, instance, *args, **kwargs):
+            # Another worker commits the same name between our select and insert
+            if isinstance(instance, TransactionCategory):
+                with Session(engine) as other:
+                    other.add(TransactionCategory(name=instance.name))
+                    other.commit()
+            super().add(instance, *args, **kwargs)
+
+    with RacingSession(engine) as db:
+        category_id = service.get_id("pet food", db)
+    with Session(engine) as db:
+        stored = db.exec(select(TransactionCategory)).all()
+    assert [(c.id, c.name) for c in stored] == [(category_id, "Pet Food")]
+
+
+@pytest.mark.parametrize("raw", ["Expense", " income ", "EXPENSE"])
+def test_transaction_type_accepts_legacy_spellings(raw):
+    payload = {"amount": 1.0, "category": "Food", "date": "2026-01-01", "type": raw}
+    assert TransactionCreate(**payload).type in (TransactionType.INCOME, TransactionType.EXPENSE)
+
+
+def test_migration_converts_legacy_rows(engine):
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE financialtransaction (id INTEGER PRIMARY KEY, amount FLOAT, "
+            "category VARCHAR NOT NULL, date DATE, user_id INTEGER, type VARCHAR)"
+        ))
+        conn.execute(text(
+            "INSERT INTO financialtransaction (amount, category, date, user_id, type) VALUES "
+            "(1, 'groceries', '2026-01-01', 1, ' Expense'), "
+            "(2, 'Groceries ', '2026-01-02', 1, 'expense'), "
+            "(3, '  ', '2026-01-03', 1, 'INCOME')"
+        ))
+
+    migrate_transaction_categories(engine)
+    migrate_transaction_categories(engine)  # a rerun is a no-op
+
+    with engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT t.amount, c.name, t.type FROM financialtransaction t "
+            "JOIN transactioncategory c ON c.id = t.category_id ORDER BY t.amount"
+        )).all()
+        columns = [row[1] for row in conn.execute(text("PRAGMA table_info(financialtransaction)"))]
+    assert [tuple(row) for row in rows] == [
+        (1.0, "Groceries", "expense"),
+        (2.0, "Groceries", "expense"),
+        (3.0, "Uncategorized", "income"),
+    ]
+    assert "category" not in columns
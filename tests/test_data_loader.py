@@ -0,0 +1,79 @@
+from datetime import date, timedelta
+import pytest
+from sqlalchemy import create_engine, event
+from sqlmodel import Session, SQLModel
+from shared.data_loader import DataLoader
+from shared.database import (
+    FinancialTransaction, SavingsGoal, TransactionCategory, TransactionType, UpcomingBill
+)
+from shared.transaction_cache import transaction_cache
+
+TODAY = date.today()
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    SQLModel.metadata.create_all(engine, tables=[
+        TransactionCategory.__table__,
+        FinancialTransaction.__table__,
+        SavingsGoal.__table__,
+        UpcomingBill.__table__,
+    ])
+    with Session(engine) as db:
+        db.add(TransactionCategory(id=1, name="Groceries"))
+        db.add(FinancialTransaction(user_id=1, amount=40.0, category_id=1, date=TODAY, type=TransactionType.EXPENSE))
+        for goal_id in (1, 2, 3):
+            db.add(SavingsGoal(id=goal_id, user_id=1, target_amount=100.0, deadline=TODAY + timedelta(days=30), category="Travel"))
+        db.add(UpcomingBill(user_id=1, amount=20.0, due_date=TODAY + timedelta(days=1), description="Phone"))
+        db.commit()
+    transaction_cache.clear()
+    yield engine
+    transaction_cache.clear()
+
+
+@pytest.fixture
+def queries(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+def test_history_reads_are_memoized(engine, queries):
+    with Session(engine) as db:
+        loader = DataLoader(db)
+        first = loader.monthly_totals(1, start=TODAY.replace(day=1))
+        assert loader.monthly_totals(1, start=TODAY.replace(day=1)) is first
+        assert loader.category_totals(1) == {1: 40.0}
+        assert loader.has_history(1)
+    assert len(queries) == 1
+
+
+def test_goals_are_batched_and_shared(engine, queries):
+    with Session(engine) as db:
+        loader = DataLoader(db)
+        assert sorted(loader.goals_by_id([1, 2, 99])) == [1, 2]
+        assert loader.goal(1) is loader.goals_by_id([1])[1]
+        assert loader.goal(99) is None
+        loader.goal(3)
+    # one IN query for 1, 2 and 99, one for 3
+    assert len(queries) == 2
+
+
+def test_user_goals_fill_the_per_goal_memo(engine, queries):
+    with Session(engine) as db:
+        loader = DataLoader(db)
+        assert len(loader.goals(1)) == 3
+        loader.goal(2)
+        loader.goals(1)
+    assert len(queries) == 1
+
+
+def test_bills_are_memoized_per_window(engine, queries):
+    with Session(engine) as db:
+        loader = DataLoader(db)
+        window = dict(start=TODAY, end=TODAY + timedelta(days=7))
+        assert [bill.amount for bill in loader.bills(1, **window)] == [20.0]
+        loader.bills(1, **window)
+        assert loader.bills(1, start=TODAY + timedelta(days=2)) == []
+    assert len(queries) == 2
@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import create_engine
+from sqlmodel import Session, SQLModel, select
+from shared.database import SavingsGoalProgress
+from shared.goal_progress import bucket_start, downsample_progress, record_progress
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    SQLModel.metadata.create_all(engine, tables=[SavingsGoalProgress.__table__])
+    return engine
+
+
+def add_points(engine, *timestamps, goal_id=1):
+    with Session(engine) as db:
+        for i, ts in enumerate(timestamps):
+            record_progress(db, goal_id, amount=float(i), daily_required=1.0, ts=ts)
+        db.commit()
+
+
+def points(engine):
+    with Session(engine) as db:
+        rows = db.exec(select(SavingsGoalProgress).order_by(SavingsGoalProgress.ts)).all()
+        return [(row.ts, row.resolution, row.amount) for row in rows]
+
+
+def test_bucket_start():
+    ts = datetime(2026, 10, 15, 13, 45)  # a Thursday
+    assert bucket_start("daily", ts) == datetime(2026, 10, 15)
+    assert bucket_start("weekly", ts) == datetime(2026, 10, 12)
+    assert bucket_start("monthly", ts) == datetime(2026, 10, 1)
+    with pytest.raises(ValueError):
+        bucket_start("hourly", ts)
+
+
+def test_day_straddling_the_cutoff_is_rolled_up_once(engine):
+    day = datetime(2026, 10, 1)
+    add_points(engine, *(day + timedelta(hours=h) for h in (8, 10, 14, 16)))
+
+    # now - 7 days lands at noon, in the middle of the day's points
+    first = day + timedelta(days=7, hours=12)
+    assert downsample_progress(engine, now=first)["daily"] == 0
+    assert [resolution for _, resolution, _ in points(engine)] == ["raw"] * 4
+
+    downsample_progress(engine, now=first + timedelta(hours=12))
+    downsample_progress(engine, now=first + timedelta(days=1))
+    assert points(engine) == [(day + timedelta(hours=16), "daily", 3.0)]
+
+
+def test_tiers_cascade_and_old_points_expire(engine):
+    now = datetime(2026, 10, 19, 12)
+    add_points(
+        engine,
+        now - timedelta(days=6 * 365),
+        datetime(2025, 6, 3), datetime(2025, 6, 20),  # one month, over a year ago
+        datetime(2026, 3, 2), datetime(2026, 3, 4),  # one ISO week, over 90 days ago
+        now - timedelta(days=1),
+    )
+    for _ in range(3):
+        downsample_progress(engine, now=now)
+
+    assert [(ts, resolution) for ts, resolution, _ in points(engine)] == [
+        (datetime(2025, 6, 20), "monthly"),
+        (datetime(2026, 3, 4), "weekly"),
+        (now - timedelta(days=1), "raw"),
+    ]
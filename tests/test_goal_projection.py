@@ -0,0 +1,78 @@
+from datetime import date, timedelta
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from services.goal_projection import normal_cdf, project_goals, savings_rate
+
+TODAY = date(2026, 1, 1)
+
+
+def goal(goal_id, target, current, days):
+    return SimpleNamespace(
+        id=goal_id, category="Travel", target_amount=target,
+        current_amount=current, deadline=TODAY + timedelta(days=days)
+    )
+
+
+def test_normal_cdf():
+    values = normal_cdf(np.array([-1.96, 0.0, 1.96]))
+    assert values == pytest.approx([0.025, 0.5, 0.975], abs=1e-3)
+
+
+def test_savings_rate():
+    rate = savings_rate({
+        "2026-01": {"income": 3000.0, "expenses": 2100.0},
+        "2026-02": {"income": 3000.0, "expenses": 2700.0},
+    }, date(2026, 1, 1), date(2026, 3, 1))
+    assert rate["daily_mean"] == pytest.approx(1200 / 59)
+    assert rate["daily_std"] > 0
+    assert savings_rate({}, date(2026, 1, 1), date(2026, 3, 1)) == {"daily_mean": 0.0, "daily_std": 0.0}
+
+
+def test_partial_months_use_the_days_they_cover():
+    # Ten days of January and five days of April around two full months
+    monthly = {
+        "2026-01": {"income": 100.0, "expenses": 0.0},
+        "2026-02": {"income": 280.0, "expenses": 0.0},
+        "2026-03": {"income": 310.0, "expenses": 0.0},
+        "2026-04": {"income": 50.0, "expenses": 0.0},
+    }
+    rate = savings_rate(monthly, date(2026, 1, 22), date(2026, 4, 6))
+    assert rate["daily_mean"] == pytest.approx(10.0)
+    # Both complete months saved exactly 10/day, so there is no spread
+    assert rate["daily_std"] == pytest.approx(0.0)
+
+
+def test_spread_ignores_partial_months():
+    monthly = {
+        "2026-01": {"income": 0.0, "expenses": 5000.0},
+        "2026-02": {"income": 280.0, "expenses": 0.0},
+        "2026-03": {"income": 310.0, "expenses": 0.0},
+    }
+    rate = savings_rate(monthly, date(2026, 1, 30), date(2026, 4, 1))
+    assert rate["daily_std"] == pytest.approx(abs(rate["daily_mean"] - 10) * np.sqrt(59))
+
+
+def test_savings_are_split_by_what_each_goal_needs():
+    goals = [goal(1, 1000, 900, 100), goal(2, 3000, 0, 30)]
+    # 1/day + 100/day needed
+    covered = project_goals(goals, {"daily_mean": 120.0, "daily_std": 5.0}, TODAY)
+    short = project_goals(goals, {"daily_mean": 50.0, "daily_std": 5.0}, TODAY)
+
+    assert [p["daily_required"] for p in covered] == [1.0, 100.0]
+    assert covered[0]["projected_savings"] == pytest.approx(120 / 101 * 100, abs=0.01)
+    assert all(p["probability_of_success"] > 0.99 for p in covered)
+    assert all(p["probability_of_success"] < 0.01 for p in short)
+
+
+def test_finished_and_overdue_goals():
+    rate = {"daily_mean": 10.0, "daily_std": 0.0}
+    reached, overdue = project_goals([goal(1, 500, 500, 30), goal(2, 500, 100, -5)], rate, TODAY)
+
+    assert reached["probability_of_success"] == 1.0
+    assert overdue["probability_of_success"] == 0.0
+    assert overdue["days_remaining"] == 0
+
+
+def test_no_goals():
+    assert project_goals([], {"daily_mean": 0.0, "daily_std": 0.0}, TODAY) == []
@@ -0,0 +1,116 @@
+import asyncio
+import pytest
+from shared.job_queue import InMemoryJobBackend, JobQueue
+
+
+def make_queue(backend=None) -> JobQueue:
+    queue = JobQueue("test", backend=backend or InMemoryJobBackend())
+
+    async def echo(payload):
+        return payload
+
+    queue.register("echo", echo)
+    return queue
+
+
+def test_tenants_take_turns():
+    async def run():
+        queue = make_queue()
+        for i in range(3):
+            await queue.enqueue("echo", tenant="busy", payload={"i": i})
+        await queue.enqueue("echo", tenant="quiet", payload={"i": 0})
+
+        popped = [await queue.backend.pop("test") for _ in range(4)]
+        return [job.tenant for job in popped]
+
+    assert asyncio.run(run()) == ["busy", "quiet", "busy", "busy"]
+
+
+def test_priority_orders_a_tenants_own_jobs():
+    async def run():
+        queue = make_queue()
+        await queue.enqueue("echo", tenant="a", payload={"name": "low"}, priority=1)
+        await queue.enqueue("echo", tenant="a", payload={"name": "high"}, priority=5)
+        return [(await queue.backend.pop("test")).payload["name"] for _ in range(2)]
+
+    assert asyncio.run(run()) == ["high", "low"]
+
+
+def test_run_job_stores_the_result():
+    async def run():
+        queue = make_queue()
+        job = await queue.enqueue("echo", tenant="a", payload={"x": 1}, owner="a@example.com")
+        await queue.run_job(await queue.backend.pop("test"))
+        return await queue.get(job.id)
+
+    job = asyncio.run(run())
+    assert job.status == "done"
+    assert job.result == {"x": 1}
+    assert job.owner == "a@example.com"
+
+
+def test_unregistered_callback_host_is_rejected():
+    async def run():
+        await make_queue().enqueue("echo", tenant="a", payload={}, callback_url="http://169.254.169.254/")
+
+    with pytest.raises(ValueError):
+        asyncio.run(run())
+
+
+def test_in_memory_jobs_expire():
+    async def run():
+        backend = InMemoryJobBackend(ttl=0)
+        queue = make_queue(backend)
+        job = await queue.enqueue("echo", tenant="a", payload={})
+        return await queue.get(job.id), await backend.pop("test"), backend.queues
+
+    job, popped, queues = asyncio.run(run())
+    assert job is None
+    assert popped is None
+    assert not queues
+
+
+def test_queues_sharing_slots_share_one_cap():
+    async def run():
+        backend = InMemoryJobBackend()
+        slots = asyncio.Semaphore(1)
+        running, peak = [0], [0]
+
+        async def slow(payload):
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+            await asyncio.sleep(0.01)
+            running[0] -= 1
+
+        queues = [JobQueue(name, backend=backend, max_concurrency=2, slots=slots) for name in ("a", "b")]
+        for queue in queues:
+            queue.register("slow", slow)
+            for _ in range(3):
+                await queue.enqueue("slow", tenant="t", payload={})
+            queue.start()
+        await asyncio.sleep(0.2)
+        for queue in queues:
+            await queue.stop()
+        statuses = {job.status for job in backend.jobs.values()}
+        return peak[0], statuses
+
+    peak, statuses = asyncio.run(run())
+    assert peak == 1
+    assert statuses == {"done"}
+
+
+def test_stopping_one_queue_leaves_the_shared_backend_open():
+    async def run():
+        backend = InMemoryJobBackend()
+        closed = []
+
+        async def close():
+            closed.append(True)
+
+        backend.close = close
+        queue = make_queue(backend)
+        queue.start()
+        await queue.stop()
+        return closed
+
+    assert asyncio.run(run()) == []
@@ -0,0 +1,84 @@
+import asyncio
+from services.model_router import MIN_SAMPLES, ModelCandidate, ModelRouter, RoutingPolicy
+from services.openrouter_service import OpenRouterService
+
+MODELS = {
+    model.name: model for model in [
+        ModelCandidate(name="small", tier=1, latency_target_ms=1000, cost_per_1k_tokens=0.1),
+        ModelCandidate(name="medium", tier=2, latency_target_ms=2000, cost_per_1k_tokens=0.5),
+        ModelCandidate(name="large", tier=3, latency_target_ms=2000, cost_per_1k_tokens=0.2),
+    ]
+}
+POLICY = RoutingPolicy(min_tier=1, latency_target_ms=2000, candidates=["small", "medium", "large"])
+
+
+def router() -> ModelRouter:
+    return ModelRouter(MODELS, {"route": POLICY})
+
+
+def record(router: ModelRouter, model: str, count: int, ok: bool = True, latency_ms: float = 100, slow: bool = False):
+    for _ in range(count):
+        router.record(model, ok, latency_ms, slow)
+
+
+def test_without_samples_ranks_by_latency_target_then_cost():
+    assert router().rank("route") == ["small", "large", "medium"]
+
+
+def test_min_tier_filters_candidates():
+    routing = ModelRouter(MODELS, {"route": RoutingPolicy(min_tier=2, latency_target_ms=2000, candidates=["small", "medium"])})
+    assert routing.rank("route") == ["medium"]
+    assert routing.select("unknown", default="fallback") == "fallback"
+
+
+def test_observed_latency_beats_targets():
+    routing = router()
+    record(routing, "large", MIN_SAMPLES, latency_ms=300)
+    record(routing, "small", MIN_SAMPLES, latency_ms=800)
+    assert routing.select("route") == "large"
+
+
+def test_failing_model_is_demoted():
+    routing = router()
+    record(routing, "small", MIN_SAMPLES, ok=False)
+    assert routing.rank("route")[-1] == "small"
+
+
+def test_slow_model_is_demoted():
+    routing = router()
+    record(routing, "small", MIN_SAMPLES, latency_ms=5000)
+    assert routing.rank("route")[-1] == "small"
+
+
+def test_hedge_losses_demote_a_model():
+    routing = router()
+    record(routing, "small", 20, latency_ms=10)
+    record(routing, "small", 10, latency_ms=20, slow=True)
+    assert routing.stats["small"].summary()["slow_rate"] > 0.3
+    assert routing.rank("route")[-1] == "small"
+
+
+def test_hedged_requests_route_away_from_a_model_that_slowed_down():
+    service = OpenRouterService()
+    service.rate_limit = 10 ** 6
+    slow_model = service.router.rank("cashflow_prediction")[0]
+    delays = {}
+
+    async def post_completion(prompt, model, timeout):
+        await asyncio.sleep(delays.get(model, 0.005))
+        return {"id": "1", "model": model, "created": 0, "choices": [{"message": {"content": "{}"}}]}
+
+    service._post_completion = post_completion
+
+    async def run(count):
+        for _ in range(count):
+            await service.make_request("prompt", route="cashflow_prediction")
+
+    asyncio.run(run(20))
+    delays[slow_model] = 0.5
+    asyncio.run(run(15))
+
+    summary = service.router.stats[slow_model].summary()
+    assert summary["samples"] > 20
+    assert summary["slow_rate"] > 0
+    assert service.router.rank("cashflow_prediction")[0] != slow_model
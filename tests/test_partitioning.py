@@ -0,0 +1,72 @@
+from datetime import date
+import pytest
+from sqlalchemy import create_engine
+from sqlmodel import Session, SQLModel, select
+from shared.database import (
+    FinancialTransaction, TransactionCategory, TransactionMonthlySummary, TransactionType
+)
+from shared.partitioning import (
+    add_months, archive_old_transactions, ensure_upcoming_partitions, hot_window_start,
+    month_start, partition_name
+)
+
+
+def test_add_months_crosses_years():
+    assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    assert add_months(date(2026, 3, 1), -24) == date(2024, 3, 1)
+
+
+def test_month_helpers():
+    assert month_start(date(2026, 5, 31)) == date(2026, 5, 1)
+    assert hot_window_start(date(2026, 7, 15)) == date(2026, 1, 1)
+    assert partition_name(date(2026, 2, 1)) == "financialtransaction_2026_02"
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    SQLModel.metadata.create_all(engine, tables=[
+        TransactionCategory.__table__,
+        FinancialTransaction.__table__,
+        TransactionMonthlySummary.__table__,
+    ])
+    return engine
+
+
+def add(db, day, amount, tx_type=TransactionType.EXPENSE, user_id=1):
+    db.add(FinancialTransaction(user_id=user_id, amount=amount, category_id=1, date=day, type=tx_type))
+
+
+def test_sqlite_archival_summarizes_and_deletes_old_months(engine):
+    with Session(engine) as db:
+        db.add(TransactionCategory(id=1, name="Groceries"))
+        add(db, date(2024, 1, 3), 10.0)
+        add(db, date(2024, 1, 20), 15.0)
+        add(db, date(2024, 1, 25), 500.0, TransactionType.INCOME)
+        add(db, date(2024, 2, 2), 7.0)
+        add(db, date(2026, 1, 5), 99.0)
+        db.commit()
+
+    archived = archive_old_transactions(engine, retention_months=24, today=date(2026, 2, 10))
+    assert archived == [date(2024, 1, 1)]
+
+    with Session(engine) as db:
+        remaining = sorted(tx.date for tx in db.exec(select(FinancialTransaction)).all())
+        summaries = {
+            (s.month, TransactionType(s.type)): (s.total, s.count)
+            for s in db.exec(select(TransactionMonthlySummary)).all()
+        }
+    assert remaining == [date(2024, 2, 2), date(2026, 1, 5)]
+    assert summaries == {
+        (date(2024, 1, 1), TransactionType.EXPENSE): (25.0, 2),
+        (date(2024, 1, 1), TransactionType.INCOME): (500.0, 1),
+    }
+
+
+def test_sqlite_archival_with_nothing_old(engine):
+    assert archive_old_transactions(engine, today=date(2026, 2, 10)) == []
+
+
+def test_partition_creation_is_a_no_op_off_postgres(engine):
+    ensure_upcoming_partitions(engine)
@@ -0,0 +1,44 @@
+import json
+from services.prompt_compaction import (
+    compact_category_totals, compact_monthly_history, count_tokens
+)
+
+HISTORY = {
+    f"2026-{month:02d}": {"income": 5000.25 + month, "expenses": 3200.75 + month}
+    for month in range(1, 7)
+}
+
+
+def test_history_fits_unchanged_when_budget_allows():
+    table = compact_monthly_history(HISTORY, 1000)
+    assert table.splitlines()[0] == "month,income,expenses"
+    assert len(table.splitlines()) == 1 + len(HISTORY)
+    assert "2026-06,5006,3207" in table
+
+
+def test_history_folds_oldest_months_to_fit():
+    table = compact_monthly_history(HISTORY, 40)
+    assert count_tokens(table) <= 40
+    assert table.splitlines()[1].startswith("avg 2026-01..")
+    assert table.splitlines()[-1].startswith("2026-06,")
+
+
+def test_history_keeps_latest_month_even_over_budget():
+    table = compact_monthly_history(HISTORY, 1)
+    assert table.splitlines()[-1].startswith("2026-06,")
+
+
+def test_history_accepts_json():
+    assert compact_monthly_history(json.dumps(HISTORY), 1000) == compact_monthly_history(HISTORY, 1000)
+
+
+def test_category_totals_fold_the_tail_into_other():
+    totals = {"Rent": 1500.0, "Groceries": 400.4, "Fun": 50.0, "Books": 20.0}
+    table = compact_category_totals(totals, 8)
+    assert count_tokens(table) <= 8
+    assert table.splitlines()[0] == "Rent,1500"
+    assert table.splitlines()[-1].startswith("Other,")
+
+
+def test_empty_category_totals():
+    assert compact_category_totals({}, 10) == "none"
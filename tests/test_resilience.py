@@ -0,0 +1,150 @@
+import asyncio
+import json
+import httpx
+import pytest
+from fastapi import HTTPException
+from shared.resilience import (
+    CircuitBreaker, CircuitOpenError, Deadline, backoff_delay, call_with_resilience
+)
+from services.openrouter_service import OpenRouterService
+
+
+def open_breaker(breaker: CircuitBreaker):
+    for _ in range(breaker.min_calls):
+        breaker.record(False, 0.01)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_breaker_opens_on_error_rate():
+    breaker = CircuitBreaker("test", min_calls=4, error_threshold=0.5)
+    breaker.record(True, 0.01)
+    breaker.record(True, 0.01)
+    breaker.record(False, 0.01)
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record(False, 0.01)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_breaker_opens_on_slow_calls():
+    breaker = CircuitBreaker("test", min_calls=2, slow_call_seconds=1.0, slow_call_threshold=0.5)
+    breaker.record(True, 0.1)
+    breaker.record(True, 2.0)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_half_open_allows_a_single_trial():
+    breaker = CircuitBreaker("test", min_calls=2, cooldown=0.0)
+    open_breaker(breaker)
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record(True, 0.01)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.parametrize("error", [ValueError("bad body"), asyncio.CancelledError()])
+def test_non_retryable_trial_releases_the_half_open_slot(error):
+    breaker = CircuitBreaker("test", min_calls=2, cooldown=0.0)
+    open_breaker(breaker)
+
+    async def failing(timeout):
+        raise error
+
+    async def succeeding(timeout):
+        return "ok"
+
+    async def run():
+        with pytest.raises(type(error)):
+            await call_with_resilience(failing, breaker, Deadline(5), retry_on=(httpx.TransportError,))
+        assert not breaker.trial_in_flight
+        return await call_with_resilience(succeeding, breaker, Deadline(5))
+
+    assert asyncio.run(run()) == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_retries_then_succeeds():
+    breaker = CircuitBreaker("test")
+    attempts = []
+
+    async def flaky(timeout):
+        attempts.append(timeout)
+        if len(attempts) < 3:
+            raise httpx.ConnectError("down")
+        return "ok"
+
+    result = asyncio.run(call_with_resilience(flaky, breaker, Deadline(5), retries=2))
+    assert result == "ok"
+    assert len(attempts) == 3
+    assert breaker.error_rate == pytest.approx(2 / 3)
+
+
+def test_open_breaker_rejects_without_calling():
+    breaker = CircuitBreaker("test", min_calls=2, cooldown=60.0)
+    open_breaker(breaker)
+
+    async def never(timeout):
+        raise AssertionError("should not be called")
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(call_with_resilience(never, breaker, Deadline(5)))
+
+
+def test_hedge_returns_the_first_success():
+    breaker = CircuitBreaker("test")
+    for _ in range(20):
+        breaker.record(True, 0.01)
+    calls = []
+
+    async def slow_then_fast(timeout):
+        calls.append(timeout)
+        await asyncio.sleep(1.0 if len(calls) == 1 else 0.0)
+        return len(calls)
+
+    result = asyncio.run(call_with_resilience(slow_then_fast, breaker, Deadline(5), hedge=True))
+    assert len(calls) == 2
+    assert result == 2
+
+
+def test_backoff_is_capped():
+    assert all(0 <= backoff_delay(attempt, base=0.2, cap=2.0) <= 2.0 for attempt in range(10))
+
+
+def make_service(reply):
+    service = OpenRouterService()
+
+    async def post_completion(prompt, model, timeout):
+        return reply
+
+    service._post_completion = post_completion
+    return service
+
+
+def completion(content: str):
+    return {
+        "id": "1",
+        "model": "m",
+        "created": 0,
+        "choices": [{"message": {"content": content}}]
+    }
+
+
+@pytest.mark.parametrize("reply", [completion("not json"), {"unexpected": True}, completion("{}") | {"choices": []}])
+def test_unreadable_reply_uses_the_fallback(reply):
+    service = make_service(reply)
+    result = asyncio.run(service.make_request("prompt", fallback=lambda: {"source": "local"}))
+    assert result == {"source": "local"}
+
+
+def test_unreadable_reply_without_fallback_is_an_error():
+    service = make_service(completion("not json"))
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(service.make_request("prompt"))
+    assert error.value.status_code == 500
+
+
+def test_reply_is_parsed():
+    service = make_service(completion(json.dumps({"predicted_amount": 12.5})))
+    assert asyncio.run(service.make_request("prompt")) == {"predicted_amount": 12.5}
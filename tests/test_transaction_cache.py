@@ -0,0 +1,75 @@
+from datetime import date
+from shared.database import TransactionType
+from shared.transaction_cache import TransactionCache, UserHistory
+
+
+def history(rows) -> UserHistory:
+    result = UserHistory()
+    for tx_date, amount, category_id, tx_type in rows:
+        result.append(tx_date, amount, category_id, tx_type)
+    return result
+
+
+ROWS = [
+    (date(2026, 1, 5), 100.0, 1, TransactionType.EXPENSE),
+    (date(2026, 1, 20), 50.0, 2, TransactionType.EXPENSE),
+    (date(2026, 1, 31), 1000.0, 3, TransactionType.INCOME),
+    (date(2026, 2, 1), 25.0, 1, TransactionType.EXPENSE),
+]
+
+
+def test_monthly_totals():
+    assert history(ROWS).monthly_totals() == {
+        "2026-01": {"income": 1000.0, "expenses": 150.0},
+        "2026-02": {"income": 0.0, "expenses": 25.0},
+    }
+
+
+def test_category_totals_respect_the_window():
+    totals = history(ROWS).category_totals(start=date(2026, 1, 1), end=date(2026, 2, 1))
+    assert totals == {1: 100.0, 2: 50.0}
+
+
+def test_grows_past_initial_capacity_and_keeps_large_category_ids():
+    rows = [(date(2026, 1, 1), 1.0, 70000, TransactionType.EXPENSE)] * (UserHistory.INITIAL_CAPACITY + 1)
+    result = history(rows)
+    assert result.size == len(rows)
+    assert result.category_totals() == {70000: float(len(rows))}
+
+
+def test_rows_before_since_are_ignored():
+    result = UserHistory(since=date(2026, 2, 1))
+    for row in ROWS:
+        result.append(*row)
+    assert result.size == 1
+
+
+def test_evicts_least_recently_used_within_budget():
+    one = history(ROWS)
+    cache = TransactionCache(memory_budget=one.nbytes * 2)
+    cache.put(1, one)
+    cache.put(2, history(ROWS))
+    cache.get(1)
+    cache.put(3, history(ROWS))
+
+    assert cache.get(2) is None
+    assert cache.get(1) is not None
+    assert cache.get(3) is not None
+    assert cache.memory_used <= cache.memory_budget
+
+
+def test_append_updates_cached_history_and_accounting():
+    cache = TransactionCache()
+    cache.put(1, history(ROWS))
+    for _ in range(UserHistory.INITIAL_CAPACITY):
+        cache.append(1, date(2026, 2, 2), 10.0, 1, TransactionType.EXPENSE)
+
+    assert cache.get(1).size == len(ROWS) + UserHistory.INITIAL_CAPACITY
+    assert cache.memory_used == cache.get(1).nbytes
+
+
+def test_expired_entries_are_dropped():
+    cache = TransactionCache(ttl=-1)
+    cache.put(1, history(ROWS))
+    assert cache.get(1) is None
+    assert cache.memory_used == 0